@@ -0,0 +1,10 @@
+# cli.py
+"""argparse helpers shared by the command line scripts (pregen.py, server.py, loadtest.py)."""
+import argparse
+
+def seed_arg(text):
+    """argparse type for seeds: they go into uint64 file headers and NumPy's seed sequence."""
+    seed = int(text)
+    if not 0 <= seed < 2**64:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and 2**64 - 1, got {seed}")
+    return seed
@@ -0,0 +1,82 @@
+# client.py
+"""tcod front end for the local game server (see server.py).
+
+Usage: python client.py [--host 127.0.0.1] [--port 7878]
+"""
+import argparse
+import asyncio
+import tcod
+import tcod.console
+import tcod.event
+import tcod.tileset
+from config import SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES, SERVER_HOST, SERVER_PORT, TARGET_FPS
+from net.client import GameClient
+from net.protocol import CMD_MOVE, CMD_TALK, CMD_CRAFT, CMD_USE, ITEM_KEYS
+from rendering.console_renderer import draw_remote
+
+async def play(host, port, tileset):
+    move_keys = {
+        tcod.event.KeySym.UP: (0, -1),
+        tcod.event.KeySym.DOWN: (0, 1),
+        tcod.event.KeySym.LEFT: (-1, 0),
+        tcod.event.KeySym.RIGHT: (1, 0),
+    }
+    salve = ITEM_KEYS.index("healing_salve")
+
+    client = GameClient(SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES)
+    try:
+        await client.connect(host, port)
+    except OSError as e:
+        print(f"Error: Could not connect to {host}:{port}: {e}")
+        return
+    receiver = asyncio.create_task(client.receive())
+    console = tcod.console.Console(SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES, order="F")
+
+    with tcod.context.new(
+        columns=console.width,
+        rows=console.height,
+        tileset=tileset,
+        title="This is Life",
+        vsync=True,
+    ) as context:
+        while client.connected:
+            for event in tcod.event.get():
+                if isinstance(event, tcod.event.Quit):
+                    client.connected = False
+                if isinstance(event, tcod.event.KeyDown):
+                    if event.sym in move_keys:
+                        client.queue(CMD_MOVE, *move_keys[event.sym])
+                    elif event.sym == tcod.event.KeySym.T:
+                        client.queue(CMD_TALK)
+                    elif event.sym == tcod.event.KeySym.C:
+                        client.queue(CMD_CRAFT, salve)
+                    elif event.sym == tcod.event.KeySym.H:
+                        client.queue(CMD_USE, salve)
+                    elif event.sym == tcod.event.KeySym.Q:
+                        client.connected = False
+            client.flush() # One batch per frame; the server applies it on its next tick
+
+            draw_remote(console, client)
+            context.present(console)
+            await asyncio.sleep(1.0 / TARGET_FPS)
+
+    await client.close()
+    await receiver
+
+def main():
+    parser = argparse.ArgumentParser(description="Join a local game server.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    args = parser.parse_args()
+
+    try:
+        tileset = tcod.tileset.load_tilesheet(
+            "dejavu10x10_gs_tc.png", 32, 8, tcod.tileset.CHARMAP_TCOD
+        )
+    except FileNotFoundError:
+        print("Error: Font file not found: 'dejavu10x10_gs_tc.png'")
+        return
+    asyncio.run(play(args.host, args.port, tileset))
+
+if __name__ == "__main__":
+    main()
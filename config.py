@@ -13,7 +13,7 @@ SCREEN_WIDTH_TILES = 80
 SCREEN_HEIGHT_TILES = 50
 
 # --- World Generation Settings ---
-NOISE_SCALE = 0.05       # Smaller values -> larger features
+NOISE_SCALE = 0.02       # Elevation noise per tile; smaller values -> larger features
 NOISE_OCTAVES = 4        # Adds more detail to the noise
 NOISE_PERSISTENCE = 0.5  # Controls how much detail is added each octave
 NOISE_LACUNARITY = 2.0   # Controls how much finer the detail is each octave
@@ -21,3 +21,71 @@ ELEVATION_DEEP_WATER = 0.2
 ELEVATION_WATER = 0.35
 ELEVATION_MOUNTAIN = 0.8
 ELEVATION_SNOW = 0.9
+DETAIL_NOISE_SCALE = 0.15 # Size of tall grass / flower / tree patches
+MOISTURE_SCALE = 0.03     # Moisture decides forest vs plains
+TEMPERATURE_SCALE = 0.01  # Temperature decides where mountains turn to snow
+FOREST_MOISTURE = 0.6
+SNOW_TEMPERATURE = 0.2
+TERRAIN_JITTER = 0.02     # How far fine noise nudges elevation and moisture, roughening biome borders
+TERRAIN_JITTER_SCALE = 0.3
+
+# --- Simulation Settings ---
+START_HOUR = 8                 # In-game hour when a new world begins
+GAME_MINUTES_PER_SECOND = 1.0  # How fast the in-game clock runs
+NPC_MOVE_INTERVAL = 0.5        # Seconds between steps for fully simulated NPCs
+LOD_FULL_RADIUS = 1            # Chunks around the player simulated at full detail
+LOD_DEMOTE_RADIUS = 2          # Chunks away before a village drops back to coarse detail
+COARSE_UPDATE_MINUTES = 60     # In-game minutes between coarse village updates
+VILLAGE_POPULATION_MIN = 4
+VILLAGE_POPULATION_MAX = 12
+
+# --- Visibility Settings ---
+FOV_RADIUS = 0               # 0 means sight is only limited by the viewport
+FOV_HIDDEN_BRIGHTNESS = 0.3  # Brightness of tiles outside the field of view
+NIGHT_START_HOUR = 20
+NIGHT_END_HOUR = 6
+LIGHT_RADIUS_NIGHT = 8       # Radius of the player's light outdoors at night
+NIGHT_AMBIENT = 0.35         # Brightness of visible tiles beyond the light at night
+LIGHT_RADIUS_INTERIOR = 5    # Radius of the player's light inside buildings
+INTERIOR_AMBIENT = 0.5
+
+# --- Save Settings ---
+SAVE_PATH = "savegame.dat"
+AUTOSAVE_PATH = "autosave.dat"
+AUTOSAVE_INTERVAL = 60.0 # Seconds between background autosaves
+
+# --- LLM Settings ---
+LLM_WORKERS = 2       # Concurrent requests to the Ollama server
+LLM_MAX_PENDING = 16  # Queued requests before submit() blocks or rejects
+INTERIOR_POOL_SIZE = 4 # LLM interior layouts kept per (building type, width, height)
+LLM_MAX_RETRIES = 1    # Extra attempts for a structured response that cannot be repaired
+LLM_RETRY_BUDGET = 0.2 # All retries together may not exceed this fraction of structured requests
+
+# --- Conversation Memory Settings ---
+MEMORY_TOKEN_BUDGET = 400   # Most tokens of NPC memory put into one dialogue prompt
+MEMORY_RECENT_TOKENS = 250  # Recent turns past this are folded into the summary
+MEMORY_KEEP_TURNS = 4       # Newest turns that are never folded
+MEMORY_SUMMARY_TOKENS = 120 # Target length of the rolling summary
+
+# --- Dialogue Prefetch Settings ---
+GREETING_PREFETCH_RADIUS = 5 # Tiles; NPCs this close get their next greeting generated ahead of time
+GREETING_DISCARD_RADIUS = 8  # Tiles; prefetched greetings are dropped once the player is this far away
+GREETING_PREFETCH_LIMIT = 2  # Nearest NPCs with a greeting prefetched or in flight at once
+
+# --- Frame Settings ---
+TARGET_FPS = 60
+SIM_TICK_RATE = 20                 # Fixed simulation ticks per second
+MAX_TICKS_PER_FRAME = 5            # Past this the simulation slows down instead of spiralling
+FRAME_BUDGET = 0.010               # Seconds of frame work before background work is deferred
+MAX_DEFERRED_FRAMES = 30           # After this many deferred frames one background job runs anyway
+CHUNK_PREFETCH_RADIUS = 1          # Chunks beyond the viewport generated in the background
+FRAME_STATS_WINDOW = 120           # Frames averaged for the pacing metrics
+
+# --- Server Settings ---
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7878
+SERVER_TICK_BUDGET = 0.025         # Seconds of each tick's work before background work is deferred
+SERVER_MAX_INPUTS_PER_TICK = 4     # Commands applied per client per tick; the rest wait for later ticks
+SERVER_MAX_QUEUED_INPUTS = 64      # Commands a client may have waiting; older ones are dropped
+SERVER_SEND_BUFFER_LIMIT = 262144  # Bytes; clients this far behind skip updates until they catch up
+SERVER_KEYFRAME_RATIO = 0.5        # Send the whole viewport once more than this share of it changed
@@ -0,0 +1,28 @@
+# data/biomes.py
+
+# --- Biome Detail Rules ---
+# "base" is the tile every cell of the chunk starts as. "details" are applied in
+# order, each only to cells not already claimed by an earlier rule. "patchiness"
+# correlates a rule with smooth noise so it forms natural patches (0 = scattered).
+# "trees" places tree entities on passable cells.
+BIOME_DETAIL_RULES = {
+    "plains": {
+        "base": "plains",
+        "details": [
+            {"tile": "tall_grass", "chance": 0.15, "patchiness": 1.5},
+            {"tile": "flower", "chance": 0.01, "patchiness": 1.0},
+        ],
+        "trees": {"chance": 0.02, "patchiness": 1.0, "kinds": ["oak_tree", "apple_tree", "pear_tree"]},
+    },
+    "forest": {
+        "base": "forest",
+        "details": [
+            {"tile": "tall_grass", "chance": 0.1, "patchiness": 1.0},
+        ],
+        "trees": {"chance": 0.3, "patchiness": 1.0, "kinds": ["oak_tree", "apple_tree", "pear_tree"]},
+    },
+    "water": {"base": "water"},
+    "deep_water": {"base": "deep_water"},
+    "mountain": {"base": "mountain"},
+    "snow": {"base": "snow"},
+}
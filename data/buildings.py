@@ -0,0 +1,32 @@
+# data/buildings.py
+
+# --- Building Type Definitions ---
+# Each type is turned into a cached prefab (a small tile-ID array) per size.
+# "windows" puts a window near each end of both side walls; "door" opens the
+# middle of the bottom wall.
+BUILDING_TYPES = {
+    "house": {
+        "wall": "wood_wall",
+        "floor": "wood_floor",
+        "windows": True,
+        "door": True,
+    },
+    "capital_hall": {
+        "wall": "capital_hall_wall",
+        "floor": "wood_floor",
+        "windows": False,
+        "door": True,
+    },
+    "jail": {
+        "wall": "jail_bars",
+        "floor": "wood_floor",
+        "windows": False,
+        "door": True,
+    },
+    "sheriff_office": {
+        "wall": "sheriff_office_wall",
+        "floor": "wood_floor",
+        "windows": False,
+        "door": True,
+    },
+}
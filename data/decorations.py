@@ -2,14 +2,21 @@
 
 # --- Decoration Item Definitions ---
 DECORATION_ITEM_DEFINITIONS = {
-    "bed": {"char": "b", "color": (200, 150, 100), "passable": False},
-    "table": {"char": "T", "color": (139, 69, 19), "passable": False},
-    "chair": {"char": "h", "color": (139, 69, 19), "passable": False},
-    "chest": {"char": "C", "color": (100, 50, 0), "passable": False},
-    "bookshelf": {"char": "B", "color": (100, 50, 0), "passable": False},
-    "fireplace": {"char": "F", "color": (150, 50, 0), "passable": False},
-    "rug": {"char": "=", "color": (150, 100, 50), "passable": True},
-    "plant": {"char": "p", "color": (34, 139, 34), "passable": False},
-    "barrel": {"char": "o", "color": (100, 70, 30), "passable": False},
-    "crate": {"char": "#", "color": (100, 70, 30), "passable": False},
+    "bed": {"char": "b", "color": (200, 150, 100), "passable": False, "name": "Bed"},
+    "table": {"char": "T", "color": (139, 69, 19), "passable": False, "name": "Table"},
+    "chair": {"char": "h", "color": (139, 69, 19), "passable": False, "name": "Chair"},
+    "chest": {"char": "C", "color": (100, 50, 0), "passable": False, "name": "Chest"},
+    "bookshelf": {"char": "B", "color": (100, 50, 0), "passable": False, "name": "Bookshelf"},
+    "fireplace": {"char": "F", "color": (150, 50, 0), "passable": False, "name": "Fireplace"},
+    "rug": {"char": "=", "color": (150, 100, 50), "passable": True, "name": "Rug"},
+    "plant": {"char": "p", "color": (34, 139, 34), "passable": False, "name": "Plant"},
+    "barrel": {"char": "o", "color": (100, 70, 30), "passable": False, "name": "Barrel"},
+    "crate": {"char": "#", "color": (100, 70, 30), "passable": False, "name": "Crate"},
 }
+
+# --- Interchangeable Decorations ---
+# Reused interior layouts may swap an item for another from the same group.
+DECORATION_SWAP_GROUPS = [
+    ["chest", "barrel", "crate"],
+    ["bookshelf", "plant"],
+]
@@ -0,0 +1,54 @@
+# data/entities.py
+
+# --- Entity Kind Definitions ---
+# Each kind becomes a row in the EntityStore lookup tables, so per-entity storage
+# only needs the kind ID. "mobile" entities are hidden when out of sight.
+ENTITY_KINDS = {
+    "oak_tree": {
+        "char": "O",
+        "color": (0, 100, 0), # Darker green for oak
+        "name": "Oak Tree",
+        "passable": False,
+        "mobile": False,
+        "max_hp": 3,
+        "drops": {"acorn": 1, "wood": 1},
+    },
+    "apple_tree": {
+        "char": "A",
+        "color": (0, 150, 0), # Lighter green for apple tree
+        "name": "Apple Tree",
+        "passable": False,
+        "mobile": False,
+        "max_hp": 3,
+        "drops": {"apple": 1, "wood": 1},
+    },
+    "pear_tree": {
+        "char": "P",
+        "color": (0, 120, 0), # Medium green for pear tree
+        "name": "Pear Tree",
+        "passable": False,
+        "mobile": False,
+        "max_hp": 3,
+        "drops": {"pear": 1, "wood": 1},
+    },
+    "villager": {
+        "char": "N",
+        "color": (0, 255, 0), # Green color for NPC
+        "name": "Villager",
+        "passable": True,
+        "mobile": True,
+        "max_hp": 10,
+        "drops": {},
+    },
+    "wanderer": {
+        "char": "N",
+        "color": (0, 255, 0),
+        "name": "Wanderer",
+        "passable": True,
+        "mobile": True,
+        "max_hp": 10,
+        "drops": {},
+    },
+}
+
+TREE_KINDS = ["oak_tree", "apple_tree", "pear_tree"]
@@ -8,6 +8,7 @@ COLORS = {
     "wall_fg": (139, 69, 19),    # Brown
     "door_fg": (160, 82, 45),    # Lighter Brown
     "player_fg": (255, 255, 0),    # Yellow
+    "other_player_fg": (0, 200, 255), # Cyan, other clients on a server
     "water_fg": (64, 100, 164),    # Blue
     "deep_water_fg": (40, 60, 120), # Dark Blue
     "tall_grass_fg": (60, 140, 60),    # A darker, richer green
@@ -40,7 +41,8 @@ TILE_DEFINITIONS = {
         "char": "#",
         "color": COLORS["wall_fg"],
         "passable": False,
-        "name": "Wood Wall"
+        "name": "Wood Wall",
+        "transparent": False
     },
     "door": {
         "char": "+",
@@ -76,7 +78,8 @@ TILE_DEFINITIONS = {
         "char": "^",
         "color": COLORS["mountain_fg"],
         "passable": False,
-        "name": "Mountain"
+        "name": "Mountain",
+        "transparent": False
     },
     "snow": {
         "char": "*",
@@ -106,7 +109,8 @@ TILE_DEFINITIONS = {
         "char": "#",
         "color": (150, 150, 150), # Grey stone
         "passable": False,
-        "name": "Capital Hall Wall"
+        "name": "Capital Hall Wall",
+        "transparent": False
     },
     "jail_bars": {
         "char": "=",
@@ -118,6 +122,7 @@ TILE_DEFINITIONS = {
         "char": "#",
         "color": (120, 100, 80), # Brownish grey
         "passable": False,
-        "name": "Sheriff Office Wall"
+        "name": "Sheriff Office Wall",
+        "transparent": False
     },
 }
@@ -0,0 +1,28 @@
+# data/villagers.py
+
+# --- Villager Generation (LLM-free) ---
+VILLAGER_NAMES = [
+    "Alden", "Bryn", "Cora", "Dorian", "Edda", "Fenn", "Greta", "Hale",
+    "Isla", "Jory", "Kestrel", "Lorne", "Maren", "Nell", "Osric", "Pella",
+    "Quill", "Rowan", "Sable", "Tamsin", "Ulric", "Vera", "Wren", "Yara",
+]
+VILLAGER_PERSONALITIES = ["jovial", "grumpy", "shy", "curious", "stern", "kind", "nervous"]
+VILLAGER_ATTITUDES = ["friendly", "suspicious", "indifferent", "welcoming"]
+VILLAGER_ROLES = ["farmer", "baker", "smith", "guard", "merchant", "carpenter"]
+
+# --- Daily Schedule ---
+# (hour the activity starts, activity). The last entry wraps around midnight.
+VILLAGER_SCHEDULE = [
+    (0, "sleeping"),
+    (6, "leisure"),
+    (8, "working"),
+    (17, "leisure"),
+    (22, "sleeping"),
+]
+
+# Used for the LLM-free summaries of villages simulated at coarse detail
+VILLAGER_ACTIVITY_DESCRIPTIONS = {
+    "sleeping": "asleep in their homes",
+    "leisure": "out on the roads",
+    "working": "busy at work",
+}
@@ -2,59 +2,51 @@
 import math
 import random
 import numpy as np
-import tcod.noise
 import requests # Import requests
 import time # Import time for NPC speech timing
 from entities.base import NPC
-from entities.tree import Tree, OakTree, AppleTree, PearTree
+from entities.tree import Tree
+from entities.store import EntityStore, KIND_PASSABLE, TREE_KIND_IDS
+from worldgen.detail import DetailGenerator
+from worldgen.terrain import TerrainGenerator
+from worldgen.prefabs import stamp_prefab, find_free_positions
+from worldgen.interiors import get_pool, add_to_pool, parse_layout, vary_layout
+from simulation.lod import SimulationLOD
+from llm.queue import LLMRequestQueue
+from llm.memory import ConversationMemory
+from llm.structured import StructuredCaller
 from config import (
     WORLD_WIDTH, WORLD_HEIGHT, POI_DENSITY, CHUNK_SIZE,
-    NOISE_SCALE, NOISE_OCTAVES, NOISE_PERSISTENCE, NOISE_LACUNARITY,
-    ELEVATION_DEEP_WATER, ELEVATION_WATER, ELEVATION_MOUNTAIN, ELEVATION_SNOW,
+    START_HOUR, GAME_MINUTES_PER_SECOND,
+    SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES, CHUNK_PREFETCH_RADIUS, MAX_DEFERRED_FRAMES,
+    INTERIOR_POOL_SIZE, GREETING_PREFETCH_RADIUS, GREETING_DISCARD_RADIUS, GREETING_PREFETCH_LIMIT,
 )
-from data.tiles import TILE_DEFINITIONS, COLORS
-from tile_types import Tile
+from data.tiles import COLORS
+from tile_types import TILES, TILE_ID_DTYPE, TileRegion, tile_id
 from data.items import ITEM_DEFINITIONS
 from data.decorations import DECORATION_ITEM_DEFINITIONS
+from data.entities import TREE_KINDS
 from data.prompts import LLM_PROMPTS, OLLAMA_ENDPOINT
 
 import json # Import json for parsing LLM responses
+from collections import deque
 
 class WorldGenerator:
     """Handles the procedural generation of the world's macro-structure."""
     def __init__(self, width, height, seed=None):
         self.width = width
         self.height = height
-        self.noise = tcod.noise.Noise(
-            dimensions=2,
-            algorithm=tcod.noise.Algorithm.SIMPLEX,
-            implementation=tcod.noise.Implementation.SIMPLE,
-            hurst=NOISE_PERSISTENCE,
-            lacunarity=NOISE_LACUNARITY,
-            octaves=NOISE_OCTAVES,
-            seed=seed
-        )
-        self.elevation_map = self._generate_noise_map()
-
-    def _generate_noise_map(self):
-        noise_map = np.zeros((self.height, self.width), dtype=np.float32)
-        for y in range(self.height):
-            for x in range(self.width):
-                noise_map[y, x] = self.noise[x * NOISE_SCALE, y * NOISE_SCALE]
-        return noise_map
+        self.terrain = TerrainGenerator(seed) # Per-tile elevation, moisture and temperature
+        self.rng = random.Random(seed) # POI placement must be reproducible from the seed
+        self.biome_map = self.terrain.macro_biomes(width, height) # Biome at each chunk's center
 
     def get_biome_at(self, x, y):
-        """Determines the biome for a given CHUNK coordinate based on elevation."""
-        elevation = self.elevation_map[y, x]
-        if elevation < ELEVATION_DEEP_WATER: return "deep_water"
-        if elevation < ELEVATION_WATER: return "water"
-        if elevation < ELEVATION_MOUNTAIN: return "plains"
-        if elevation < ELEVATION_SNOW: return "mountain"
-        return "snow"
+        """Determines the biome for a given CHUNK coordinate, sampled at the chunk's center tile."""
+        return str(self.biome_map[y, x])
 
     def get_poi_at(self, x, y, biome):
         """Determines if a POI should be placed at a chunk coordinate."""
-        if biome == "plains" and random.random() < POI_DENSITY:
+        if biome == "plains" and self.rng.random() < POI_DENSITY:
             return "village"
         return None
 
@@ -68,19 +60,43 @@ class Building:
         self.interior_decorated = False # Flag for LLM decoration
 
 class Village:
-    def __init__(self):
+    def __init__(self, chunk_x, chunk_y):
+        self.chunk_x = chunk_x
+        self.chunk_y = chunk_y
         self.buildings = []
+        self.lore = ""
 
     def add_building(self, building: Building):
+        # Buildings use chunk-local coordinates, so remember which chunk they belong to
+        building.chunk_x, building.chunk_y = self.chunk_x, self.chunk_y
+        building.index = len(self.buildings)
         self.buildings.append(building)
 
+class ChunkDelta:
+    """Changes made to a chunk since it was generated from the world seed."""
+    def __init__(self):
+        self.tiles = {} # Local index (y * CHUNK_SIZE + x) -> tile ID
+        self.trees = {} # Local index -> HP left, 0 once felled
+        self.decorated_buildings = set() # Indices into the chunk's village buildings
+
+    def copy(self):
+        delta = ChunkDelta()
+        delta.tiles = dict(self.tiles)
+        delta.trees = dict(self.trees)
+        delta.decorated_buildings = set(self.decorated_buildings)
+        return delta
+
 class Chunk:
-    def __init__(self, biome, poi_type=None):
-        self.biome = biome
+    def __init__(self, chunk_x, chunk_y, biome, poi_type=None):
+        self.chunk_x = chunk_x
+        self.chunk_y = chunk_y
+        self.biome = biome # Chunk-level biome, used for POIs; tiles can differ (see biome_map)
         self.poi_type = poi_type
-        self.tiles = None
+        self.biome_map = None # (CHUNK_SIZE, CHUNK_SIZE) per-tile biome IDs, cached once sampled
+        self.tiles = None # (CHUNK_SIZE, CHUNK_SIZE) array of tile IDs, indexed [y, x]
         self.is_generated = False
         self.village = None # To store Village object if POI is a village
+        self.population = None # VillagePopulation aggregate, set for village POIs
 
 
 
@@ -101,37 +117,133 @@ class Player:
 
 class World:
     """World class now uses a generator for a more complex map."""
-    def __init__(self):
+    def __init__(self, seed=None, new_game=True, chunk_storage=None):
+        self.seed = seed if seed is not None else random.randrange(2**31)
+        self.chunk_storage = chunk_storage # Optional pregenerated terrain (see pregen.py)
+        self.deltas = {} # (chunk_x, chunk_y) -> ChunkDelta, applied when a chunk is generated
+        self.dirty_chunks = set() # Chunks whose delta changed since the last autosave snapshot
+        self.llm_results = {} # Cached LLM output (e.g. village lore) that is saved with the game
+        self.memories = {} # npc_id -> ConversationMemory, kept across LOD changes and saves
         self.chat_log = [] # Stores chat messages
+        self.chat_serial = 0 # Messages ever added; lets server clients tell which ones are new
+        self.structured = StructuredCaller(self._call_ollama) # Schema-checked JSON prompts
+        self.llm = LLMRequestQueue(self._call_ollama) # Created early: village chunks generated below request lore
+        self.awaiting_lore = [] # Village chunks whose lore request found the LLM queue full
         self.chunk_width = WORLD_WIDTH // CHUNK_SIZE
         self.chunk_height = WORLD_HEIGHT // CHUNK_SIZE
+        # Bumped per chunk on every tile change, so FOV caches only notice changes near them
+        self.chunk_versions = np.zeros((self.chunk_height, self.chunk_width), dtype=np.int64)
         self.player = Player(WORLD_WIDTH // 2, WORLD_HEIGHT // 2)
-        self.generator = WorldGenerator(self.chunk_width, self.chunk_height)
+        self.generator = WorldGenerator(self.chunk_width, self.chunk_height, seed=self.seed)
+        self.detail = DetailGenerator(self.seed)
+        self.entities = EntityStore() # Trees and NPCs, stored column-wise
         self.chunks = self._initialize_chunks()
         self.npcs = [] # Initialize NPCs list
-        self._find_starting_position()
-        self._populate_npcs()
+        if new_game: # Loaded games restore these from the save instead
+            self._find_starting_position()
+            self._populate_npcs()
         self.village_npcs = [] # To store NPCs specific to villages
+        self.world_minutes = START_HOUR * 60 # In-game clock
+        self.simulation = SimulationLOD(self)
+        # --- Background work, run from the frame loop when there is time left ---
+        self.pending_chunks = deque() # Chunks near the viewport, generated ahead of need
+        self.prefetch_origin = None
+        self.awaiting_speech = set() # NPCs with a speech request in flight
+        self.awaiting_decoration = {} # (building_type, width, height) -> buildings waiting for a first layout
+        self.interior_requests = {} # (building_type, width, height) -> layout requests in flight
+        self.greeting_slots = {} # npc key -> speculatively generated greeting (see _update_greeting_prefetch)
+        self.greeting_waiting = [] # Slots the player asked for before their greeting arrived
+        self.prefetch_stats = {"issued": 0, "hits": 0, "late_hits": 0, "misses": 0, "wasted": 0}
+        self.deferred_frames = 0
+        self.background_stats = {"chunks": 0, "llm_results": 0, "deferred_frames": 0}
         self.mouse_x = 0
         self.mouse_y = 0
         self.game_state = "PLAYING" # Initial game state
 
+    def update_simulation(self, dt: float):
+        """Advances the in-game clock and NPC simulation by dt real seconds."""
+        self.world_minutes += dt * GAME_MINUTES_PER_SECOND
+        self.simulation.update(dt)
+        self._queue_prefetch()
+        self._update_greeting_prefetch()
+
+    def _queue_prefetch(self):
+        """Queues the ungenerated chunks just beyond the viewport whenever the player changes chunk."""
+        origin = (self.player.x // CHUNK_SIZE, self.player.y // CHUNK_SIZE)
+        if origin == self.prefetch_origin:
+            return
+        self.prefetch_origin = origin
+        reach_x = SCREEN_WIDTH_TILES // 2 // CHUNK_SIZE + 1 + CHUNK_PREFETCH_RADIUS
+        reach_y = SCREEN_HEIGHT_TILES // 2 // CHUNK_SIZE + 1 + CHUNK_PREFETCH_RADIUS
+        nearby = [
+            self.chunks[chunk_y][chunk_x]
+            for chunk_y in range(max(0, origin[1] - reach_y), min(self.chunk_height, origin[1] + reach_y + 1))
+            for chunk_x in range(max(0, origin[0] - reach_x), min(self.chunk_width, origin[0] + reach_x + 1))
+        ]
+        nearby.sort(key=lambda chunk: max(abs(chunk.chunk_x - origin[0]), abs(chunk.chunk_y - origin[1])))
+        self.pending_chunks = deque(chunk for chunk in nearby if not chunk.is_generated)
+
+    def process_background_work(self, time_budget: float):
+        """Applies finished LLM results and generates prefetched chunks until time_budget seconds are used.
+
+        When a frame has no time left the work waits, but only for MAX_DEFERRED_FRAMES frames
+        before one job runs regardless, so a slow machine still makes progress.
+        """
+        if time_budget <= 0:
+            self.deferred_frames += 1
+            self.background_stats["deferred_frames"] += 1
+            if self.deferred_frames < MAX_DEFERRED_FRAMES:
+                return
+        self.deferred_frames = 0
+
+        deadline = time.perf_counter() + time_budget
+        while True:
+            # One job of each kind per pass, so neither starves the other on a busy frame
+            did_work = False
+            if self.awaiting_lore:
+                self._request_lore(self.awaiting_lore.pop(0))
+            if self.llm.poll(max_results=1):
+                self.background_stats["llm_results"] += 1
+                did_work = True
+            while self.pending_chunks:
+                chunk = self.pending_chunks.popleft()
+                if not chunk.is_generated: # The renderer may have needed it first
+                    self.generate_chunks([chunk])
+                    self.background_stats["chunks"] += 1
+                    did_work = True
+                    break
+            if not did_work or time.perf_counter() >= deadline:
+                return
+
+    def get_background_stats(self):
+        return dict(self.background_stats, pending_chunks=len(self.pending_chunks), pending_llm=self.llm.in_flight)
+
+    def get_simulation_stats(self):
+        return self.simulation.stats()
+
     def add_message_to_chat_log(self, message: str):
         self.chat_log.append(message)
+        self.chat_serial += 1
         # Keep chat log to a reasonable size
         if len(self.chat_log) > 100:
             self.chat_log.pop(0)
 
-    def _call_ollama(self, prompt: str) -> str:
-        """Makes a request to the Ollama API and returns the response."""
+    def _call_ollama(self, prompt: str, schema=None) -> str:
+        """Makes a request to the Ollama API and returns the response.
+
+        With a schema, Ollama constrains the output to JSON matching it (structured outputs).
+        """
+        request = {
+            "model": "llama3.2:latest",
+            "prompt": prompt,
+            "stream": False
+        }
+        if schema is not None:
+            request["format"] = schema
         try:
             response = requests.post(
                 OLLAMA_ENDPOINT + "/api/generate",
-                json={
-                    "model": "llama3.2:latest",
-                    "prompt": prompt,
-                    "stream": False
-                },
+                json=request,
                 timeout=30 # 30 second timeout
             )
             response.raise_for_status() # Raise an exception for HTTP errors
@@ -148,12 +260,9 @@ class World:
                     except json.JSONDecodeError:
                         pass # Fall through to try parsing full response
 
-            # If no markdown block or invalid JSON in block, try parsing full response
-            try:
-                json.loads(full_response) # Validate JSON
-                return full_response
-            except json.JSONDecodeError:
-                return "" # Return empty string if not valid JSON
+            # Otherwise return the response as is: dialogue, lore and memory summaries are plain
+            # text, and JSON callers report their own parse errors
+            return full_response.strip()
         except requests.exceptions.RequestException as e:
             print(f"Error communicating with Ollama: {e}")
             return ""
@@ -163,22 +272,25 @@ class World:
     def _populate_npcs(self):
         # Generate NPCs using LLM
         num_npcs = random.randint(1, 3) # Example: 1 to 3 NPCs per world
-        for _ in range(num_npcs):
+        for i in range(num_npcs):
             prompt = LLM_PROMPTS["npc_personality"]
-            llm_response = self._call_ollama(prompt)
+            llm_response = self.structured.request("npc_personality", prompt)
             try:
                 npc_data = json.loads(llm_response)
                 # Place NPC near player for now, will improve placement later
                 npc_x = self.player.x + random.randint(-5, 5)
                 npc_y = self.player.y + random.randint(-5, 5)
                 self.npcs.append(NPC(
+                    self.entities,
                     x=npc_x,
                     y=npc_y,
                     name=npc_data.get("name", "NPC"),
                     dialogue=npc_data.get("dialogue", ["Hello!"]),
                     personality=npc_data.get("personality", "normal"),
                     family_ties=npc_data.get("family_ties", "none"),
-                    attitude_to_player=npc_data.get("attitude_to_player", "indifferent")
+                    attitude_to_player=npc_data.get("attitude_to_player", "indifferent"),
+                    npc_id=f"wanderer:{i}",
+                    kind="wanderer"
                 ))
                 self.add_message_to_chat_log(f"Generated NPC: {npc_data.get("name", "NPC")}")
             except json.JSONDecodeError as e:
@@ -186,68 +298,109 @@ class World:
                 self.add_message_to_chat_log(f"LLM Response: {llm_response}")
 
     def _handle_npc_speech(self):
+        """Queues speech for NPCs that are due to talk; the lines arrive through process_background_work."""
         current_time = time.time()
         for npc in self.npcs + self.village_npcs:
+            if npc in self.awaiting_speech:
+                continue
             if current_time - npc.last_speech_time > random.randint(10, 30): # NPCs speak every 10-30 seconds
                 prompt = f"Generate a short, in-character dialogue response from {npc.name} to the player. {npc.name} is {npc.personality} and has {npc.attitude_to_player} attitude towards the player. Their family ties are {npc.family_ties}. Keep it concise and relevant to their personality and attitude."
-                llm_dialogue = self._call_ollama(prompt)
-                if llm_dialogue:
-                    self.add_message_to_chat_log(f"{npc.name}: {llm_dialogue}")
-                    npc.last_speech_time = current_time
+                prompt = self._with_memory(npc, prompt)
+                if self.llm.submit(prompt, lambda llm_dialogue, npc=npc: self._on_npc_speech(npc, llm_dialogue), block=False, kind="dialogue"):
+                    self.awaiting_speech.add(npc)
+
+    def _on_npc_speech(self, npc, llm_dialogue: str):
+        self.awaiting_speech.discard(npc)
+        # Waiting out the interval after failures too keeps a down server from being hammered every tick
+        npc.last_speech_time = time.time()
+        if llm_dialogue:
+            self.add_message_to_chat_log(f"{npc.name}: {llm_dialogue}")
+            self._remember(npc, npc.name, llm_dialogue)
+
+    # --- Conversation Memory ---
+    def get_memory(self, npc):
+        key = npc.npc_id or npc.name
+        memory = self.memories.get(key)
+        if memory is None:
+            memory = self.memories[key] = ConversationMemory()
+        return memory
+
+    def _with_memory(self, npc, prompt: str) -> str:
+        """Prefixes a dialogue prompt with the NPC's memory, which is capped at MEMORY_TOKEN_BUDGET tokens."""
+        context = self.get_memory(npc).prompt_context()
+        return f"{context}\n\n{prompt}" if context else prompt
+
+    def _remember(self, npc, speaker: str, text: str):
+        """Records a turn and, when the recent turns grow too long, folds the oldest into the summary in the background."""
+        memory = self.get_memory(npc)
+        memory.add_turn(speaker, text)
+        if memory.needs_summary():
+            if not self.llm.submit(memory.summary_prompt(npc.name), memory.finish_summary, block=False, kind="summary"):
+                memory.folding = 0 # Queue is full; try again after the next turn
 
     def decorate_building_interior(self, building):
-        print(f"Decorating building at {building.x}, {building.y}")
-        # Generate interior decoration using LLM
+        """Furnishes a building from the interior layout library.
+
+        A pooled layout for the building's shape is used straight away with some variation;
+        the LLM is only asked for a new one while the pool is under-filled. Buildings of a
+        shape with no layout yet wait for the first response.
+        """
+        if building.interior_decorated:
+            return
+        shape = (building.building_type, building.width, building.height)
+        pool = get_pool(self.llm_results, *shape)
+        if len(pool) + self.interior_requests.get(shape, 0) < INTERIOR_POOL_SIZE:
+            print(f"Requesting a {building.building_type} interior for {building.width}x{building.height} buildings")
+            if self.llm.submit(self.get_interior_prompt(building),
+                               lambda llm_response: self._on_interior_layout(shape, llm_response), block=False, kind="interior",
+                               call=lambda prompt: self.structured.request("building_interior", prompt)):
+                self.interior_requests[shape] = self.interior_requests.get(shape, 0) + 1
+        if pool:
+            self.place_interior(building, pool)
+        else:
+            waiting = self.awaiting_decoration.setdefault(shape, [])
+            if building not in waiting:
+                waiting.append(building)
+
+    def get_interior_prompt(self, building):
         decoration_items_list = ", ".join(DECORATION_ITEM_DEFINITIONS.keys())
-        prompt = LLM_PROMPTS["building_interior"].format(
+        return LLM_PROMPTS["building_interior"].format(
             building_type=building.building_type,
             width=building.width,
             height=building.height,
             decoration_items=decoration_items_list
         )
-        llm_response = self._call_ollama(prompt)
 
-        try:
-            decoration_data = json.loads(llm_response)
-            for item in decoration_data.get("decorations", []):
-                item_type = item.get("type")
-                item_x = item.get("x")
-                item_y = item.get("y")
-
-                if item_type and item_x is not None and item_y is not None:
-                    # Ensure item is within building bounds
-                    if 0 <= item_x < building.width and 0 <= item_y < building.height:
-                        global_x = (building.x // CHUNK_SIZE * CHUNK_SIZE) + building.x + item_x
-                        global_y = (building.y // CHUNK_SIZE * CHUNK_SIZE) + building.y + item_y
-
-                        # Get the tile definition for the decoration item
-                        decoration_tile_def = DECORATION_ITEM_DEFINITIONS.get(item_type)
-                        if decoration_tile_def:
-                            # Apply the decoration to the tile
-                            chunk_x, chunk_y = global_x // CHUNK_SIZE, global_y // CHUNK_SIZE
-                            local_x, local_y = global_x % CHUNK_SIZE, global_y % CHUNK_SIZE
-                            
-                            # Ensure the chunk is generated before trying to modify its tiles
-                            chunk = self.chunks[chunk_y][chunk_x]
-                            if not chunk.is_generated:
-                                self._generate_chunk_detail(chunk)
-
-                            self.chunks[chunk_y][chunk_x].tiles[local_y][local_x] = Tile(
-                                decoration_tile_def["char"],
-                                decoration_tile_def["color"],
-                                decoration_tile_def["passable"],
-                                decoration_tile_def["name"]
-                            )
-                            print(f"Placed {item_type} at ({global_x}, {global_y})")
-                        else:
-                            print(f"Unknown decoration item type: {item_type}")
-                    else:
-                        print(f"Decoration item {item_type} out of bounds for building at ({building.x}, {building.y})")
-        except json.JSONDecodeError as e:
-            print(f"Error parsing LLM response for interior decoration: {e}")
+    def _on_interior_layout(self, shape, llm_response: str):
+        """Adds a validated LLM layout to the library and furnishes the buildings waiting for it."""
+        self.interior_requests[shape] -= 1
+        layout = parse_layout(llm_response, shape[1], shape[2])
+        if layout is None:
             print(f"LLM Response: {llm_response}")
+            # Waiting buildings stay undecorated and ask again when next entered
+            if not self.interior_requests[shape]:
+                self.awaiting_decoration.pop(shape, None)
+            return
+        add_to_pool(self.llm_results, *shape, layout)
+        pool = get_pool(self.llm_results, *shape)
+        for building in self.awaiting_decoration.pop(shape, []):
+            self.place_interior(building, pool)
+
+    def place_interior(self, building, pool):
+        """Places a deterministic variation of one of the pooled layouts and marks the building decorated."""
+        if building.interior_decorated:
+            return
+        rng = random.Random(f"{self.seed}:{building.chunk_x}:{building.chunk_y}:{building.index}")
+        layout = vary_layout(rng.choice(pool), building.width, building.height, rng)
+        if layout:
+            origin_x = building.chunk_x * CHUNK_SIZE + building.x
+            origin_y = building.chunk_y * CHUNK_SIZE + building.y
+            item_types, item_xs, item_ys = zip(*layout)
+            self.set_tiles(origin_x + np.array(item_xs), origin_y + np.array(item_ys),
+                           [tile_id(item_type) for item_type in item_types])
 
         building.interior_decorated = True
+        self._get_delta(building.chunk_x, building.chunk_y).decorated_buildings.add(building.index)
 
     def talk_to_npc(self):
         # Find the closest NPC and interact with them
@@ -260,14 +413,93 @@ class World:
                 closest_npc = npc
 
         if closest_npc and min_dist <= 2: # Within 2 tiles
-            # Use LLM for dynamic dialogue
-            prompt = f"The player approaches {closest_npc.name}. {closest_npc.name} is {closest_npc.personality} and has {closest_npc.attitude_to_player} attitude towards the player. Their family ties are {closest_npc.family_ties}. Generate a short, in-character dialogue response from {closest_npc.name} to the player. Keep it concise and relevant to their personality and attitude."
-                
-            llm_dialogue = self._call_ollama(prompt)
-            print("\n{}: {}".format(closest_npc.name, llm_dialogue))
+            self._remember(closest_npc, "Player", "(approaches and greets you)")
+            # Serve the greeting generated while the player was walking up, if there is one
+            slot = self.greeting_slots.pop(self._npc_key(closest_npc), None)
+            if slot and slot["text"]:
+                self.prefetch_stats["hits"] += 1
+                self._deliver_greeting(closest_npc, slot["text"])
+            elif slot and slot["text"] is None:
+                self.prefetch_stats["late_hits"] += 1
+                slot["on_ready"] = lambda text: self._deliver_greeting(closest_npc, text) if text \
+                    else self._request_greeting(closest_npc)
+                self.greeting_waiting.append(slot)
+            else:
+                if slot: # The prefetch failed and came back empty
+                    self.prefetch_stats["wasted"] += 1
+                self.prefetch_stats["misses"] += 1
+                self._request_greeting(closest_npc)
         else:
             print("No one to talk to nearby.")
 
+    def _request_greeting(self, npc):
+        # Use LLM for dynamic dialogue
+        if not self.llm.submit(self._greeting_prompt(npc),
+                               lambda llm_dialogue: self._deliver_greeting(npc, llm_dialogue),
+                               block=False, kind="dialogue"):
+            print(f"{npc.name} is busy.")
+
+    def _greeting_prompt(self, npc):
+        prompt = f"The player approaches {npc.name}. {npc.name} is {npc.personality} and has {npc.attitude_to_player} attitude towards the player. Their family ties are {npc.family_ties}. Generate a short, in-character dialogue response from {npc.name} to the player. Keep it concise and relevant to their personality and attitude."
+        return self._with_memory(npc, prompt)
+
+    def _deliver_greeting(self, npc, llm_dialogue: str):
+        print("\n{}: {}".format(npc.name, llm_dialogue))
+        if llm_dialogue:
+            self.add_message_to_chat_log(f"{npc.name}: {llm_dialogue}")
+            self._remember(npc, npc.name, llm_dialogue)
+
+    # --- Greeting Prefetch ---
+    def _npc_key(self, npc):
+        return npc.npc_id or npc.name
+
+    def _update_greeting_prefetch(self):
+        """Generates greetings for NPCs the player is walking up to and drops them once the player leaves.
+
+        Only the nearest GREETING_PREFETCH_LIMIT NPCs get one, and only while an LLM worker is
+        idle, so speculative requests never queue up ahead of the player's own.
+        """
+        px, py = self.player.x, self.player.y
+        npcs = self.npcs + self.village_npcs
+        present = {id(npc) for npc in npcs} # Demoted villagers leave the lists and the store
+        for key, slot in list(self.greeting_slots.items()):
+            npc = slot["npc"]
+            if id(npc) not in present or (npc.x - px) ** 2 + (npc.y - py) ** 2 > GREETING_DISCARD_RADIUS ** 2:
+                del self.greeting_slots[key]
+                slot["discarded"] = True
+                if slot["text"] is not None:
+                    self.prefetch_stats["wasted"] += 1 # A pending one is counted when it arrives
+
+        nearby = [npc for npc in npcs if (npc.x - px) ** 2 + (npc.y - py) ** 2 <= GREETING_PREFETCH_RADIUS ** 2]
+        nearby.sort(key=lambda npc: (npc.x - px) ** 2 + (npc.y - py) ** 2)
+        for npc in nearby[:GREETING_PREFETCH_LIMIT]:
+            key = self._npc_key(npc)
+            if key in self.greeting_slots:
+                continue
+            if len(self.greeting_slots) >= GREETING_PREFETCH_LIMIT or self.llm.in_flight >= self.llm.workers:
+                return
+            slot = {"npc": npc, "text": None, "discarded": False, "on_ready": None}
+            if not self.llm.submit(self._greeting_prompt(npc), lambda text, slot=slot: self._on_greeting_ready(slot, text),
+                                   block=False, kind="prefetch"):
+                return # Queue is full; try again next tick
+            self.greeting_slots[key] = slot
+            self.prefetch_stats["issued"] += 1
+
+    def _on_greeting_ready(self, slot, text: str):
+        if slot["on_ready"] is not None: # The player already asked for it
+            self.greeting_waiting.remove(slot)
+            slot["on_ready"](text)
+        elif slot["discarded"]:
+            self.prefetch_stats["wasted"] += 1
+        else:
+            slot["text"] = text
+
+    def get_prefetch_stats(self):
+        stats = self.prefetch_stats
+        talks = stats["hits"] + stats["late_hits"] + stats["misses"]
+        return dict(stats, hit_rate=stats["hits"] / talks if talks else 0.0,
+                    waste_rate=stats["wasted"] / stats["issued"] if stats["issued"] else 0.0)
+
     def _initialize_chunks(self):
         """Initializes chunk data based on the world generator's macro map."""
         chunks = [[None for _ in range(self.chunk_width)] for _ in range(self.chunk_height)]
@@ -275,58 +507,40 @@ class World:
             for x in range(self.chunk_width):
                 biome = self.generator.get_biome_at(x, y)
                 poi_type = self.generator.get_poi_at(x, y, biome)
-                chunks[y][x] = Chunk(biome, poi_type)
+                chunks[y][x] = Chunk(x, y, biome, poi_type)
         return chunks
 
     def _find_starting_position(self):
-        """Finds a suitable starting tile for the player, searching from the center."""
+        """Finds a suitable starting tile for the player, nearest the center.
+
+        Scans walkable arrays in growing squares around the center; a walkable plains tile
+        anywhere wins over other terrain, as before.
+        """
         center_x, center_y = self.player.x, self.player.y
-        if self.get_tile_at(center_x, center_y) and self.get_tile_at(center_x, center_y).passable:
+        if self.is_walkable(center_x, center_y):
             return
 
-        # First, try to find a plains tile
-        for r in range(1, max(WORLD_WIDTH, WORLD_HEIGHT) // 2):
-            for x_offset in range(-r, r + 1):
-                for y_sign in [-1, 1]:
-                    tx, ty = center_x + x_offset, center_y + (r * y_sign)
-                    chunk_x, chunk_y = tx // CHUNK_SIZE, ty // CHUNK_SIZE
-                    if 0 <= chunk_x < self.chunk_width and 0 <= chunk_y < self.chunk_height:
-                        chunk = self.chunks[chunk_y][chunk_x]
-                        if chunk.biome == "plains":
-                            tile = self.get_tile_at(tx, ty)
-                            if tile and tile.passable:
-                                self.player.x, self.player.y = tx, ty
-                                return
-            for y_offset in range(-r + 1, r):
-                for x_sign in [-1, 1]:
-                    tx, ty = center_x + (r * x_sign), center_y + y_offset
-                    chunk_x, chunk_y = tx // CHUNK_SIZE, ty // CHUNK_SIZE
-                    if 0 <= chunk_x < self.chunk_width and 0 <= chunk_y < self.chunk_height:
-                        chunk = self.chunks[chunk_y][chunk_x]
-                        if chunk.biome == "plains":
-                            tile = self.get_tile_at(tx, ty)
-                            if tile and tile.passable:
-                                self.player.x, self.player.y = tx, ty
-                                return
-
-        # If no plains tile found, search for any passable tile
-        for r in range(1, max(WORLD_WIDTH, WORLD_HEIGHT) // 2):
-            # Check top and bottom rows of the expanding search box
-            for x_offset in range(-r, r + 1):
-                for y_sign in [-1, 1]:
-                    tx, ty = center_x + x_offset, center_y + (r * y_sign)
-                    tile = self.get_tile_at(tx, ty)
-                    if tile and tile.passable:
-                        self.player.x, self.player.y = tx, ty
-                        return
-            # Check left and right columns
-            for y_offset in range(-r + 1, r):
-                for x_sign in [-1, 1]:
-                    tx, ty = center_x + (r * x_sign), center_y + y_offset
-                    tile = self.get_tile_at(tx, ty)
-                    if tile and tile.passable:
-                        self.player.x, self.player.y = tx, ty
+        chunk_is_plains = np.array([[chunk.biome == "plains" for chunk in row] for row in self.chunks])
+        radius = CHUNK_SIZE
+        while True:
+            x0, y0 = max(0, center_x - radius), max(0, center_y - radius)
+            x1, y1 = min(WORLD_WIDTH, center_x + radius + 1), min(WORLD_HEIGHT, center_y + radius + 1)
+            walkable = self.get_walkable_region(x0, y0, x1 - x0, y1 - y0)
+            ys, xs = np.ogrid[y0:y1, x0:x1]
+            ring = np.maximum(abs(xs - center_x), abs(ys - center_y))
+            plains = walkable & chunk_is_plains[ys // CHUNK_SIZE, xs // CHUNK_SIZE]
+            covers_world = x0 == 0 and y0 == 0 and x1 == WORLD_WIDTH and y1 == WORLD_HEIGHT
+            # Only settle for a tile that no larger square could beat
+            for candidates in (plains, walkable) if covers_world else (plains,):
+                if candidates.any():
+                    distances = np.where(candidates, ring, np.iinfo(ring.dtype).max)
+                    best_y, best_x = np.unravel_index(np.argmin(distances), distances.shape)
+                    if covers_world or distances[best_y, best_x] <= radius:
+                        self.player.x, self.player.y = x0 + int(best_x), y0 + int(best_y)
                         return
+            if covers_world:
+                break
+            radius *= 2
         print("Warning: No passable starting tile found. Player may be stuck.")
 
     def _generate_chunk_detail(self, chunk: Chunk):
@@ -334,71 +548,143 @@ class World:
         if chunk.is_generated: return
 
         if chunk.poi_type == "village":
-            chunk.village = Village()
-            # Generate village lore
-            prompt = LLM_PROMPTS["village_lore"]
-            lore_response = self._call_ollama(prompt)
-            print(f"Village Lore: {lore_response}")
-            # You might want to store this lore in the chunk.village object
-            # chunk.village.lore = lore_response
-            
-            
+            chunk.village = Village(chunk.chunk_x, chunk.chunk_y)
+            # Reuse saved village lore; otherwise the village starts without it and the LLM fills it in
+            lore_key = f"village_lore:{chunk.chunk_x}:{chunk.chunk_y}"
+            if lore_key in self.llm_results:
+                chunk.village.lore = self.llm_results[lore_key]
+            else:
+                self._request_lore(chunk)
+
             tiles = self._generate_village_layout(chunk)
         else:
-            # Generate the base biome tiles
-            tiles = [[Tile(TILE_DEFINITIONS[chunk.biome]["char"], TILE_DEFINITIONS[chunk.biome]["color"], TILE_DEFINITIONS[chunk.biome]["passable"], TILE_DEFINITIONS[chunk.biome]["name"]) for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
-
-            # If the biome is plains, add some detail
-            if chunk.biome == "plains":
-                for y_local in range(CHUNK_SIZE):
-                    for x_local in range(CHUNK_SIZE):
-                        # Add patches of tall grass
-                        if random.random() < 0.15: # 15% chance
-                            tiles[y_local][x_local] = Tile(TILE_DEFINITIONS["tall_grass"]["char"], TILE_DEFINITIONS["tall_grass"]["color"], TILE_DEFINITIONS["tall_grass"]["passable"], TILE_DEFINITIONS["tall_grass"]["name"])
-                        # Add sparse flowers
-                        elif random.random() < 0.01: # 1% chance
-                            tiles[y_local][x_local] = Tile(TILE_DEFINITIONS["flower"]["char"], TILE_DEFINITIONS["flower"]["color"], TILE_DEFINITIONS["flower"]["passable"], TILE_DEFINITIONS["flower"]["name"])
+            # Per-tile terrain plus tall grass, flowers and trees, all from the vectorized stages
+            tiles, trees = self._generate_detail([chunk])
+            tiles = tiles[0]
+            if len(trees[0]):
+                self.entities.add_many(*trees)
+        self._finish_chunk(chunk, tiles)
+
+    def _request_lore(self, chunk: Chunk):
+        """Submits a village's lore prompt; if the LLM queue is full, it is retried from process_background_work."""
+        if not self.llm.submit(LLM_PROMPTS["village_lore"], lambda response: self._on_village_lore(chunk, response),
+                               block=False, kind="lore"):
+            self.awaiting_lore.append(chunk)
+
+    def _on_village_lore(self, chunk: Chunk, lore_response: str):
+        print(f"Village Lore: {lore_response}")
+        self.llm_results[f"village_lore:{chunk.chunk_x}:{chunk.chunk_y}"] = lore_response
+        chunk.village.lore = lore_response
+
+    def _finish_chunk(self, chunk: Chunk, tiles):
         chunk.tiles = tiles
         chunk.is_generated = True
+        self._apply_delta(chunk)
+        self.chunk_versions[chunk.chunk_y, chunk.chunk_x] += 1
 
-    def _generate_trees(self, tiles):
-        for y_local in range(CHUNK_SIZE):
-            for x_local in range(CHUNK_SIZE):
-                if random.random() < 0.02: # 2% chance for a tree
-                    tree_type = random.choice(["oak", "apple", "pear"])
-                    if tree_type == "oak":
-                        tree = OakTree(x_local, y_local)
-                    elif tree_type == "apple":
-                        tree = AppleTree(x_local, y_local)
-                    else:
-                        tree = PearTree(x_local, y_local)
-                    tiles[y_local][x_local] = tree
+    def _generate_detail(self, chunks):
+        """Runs the terrain and detail stages for a batch of chunks, reading pregenerated ones from chunk storage."""
+        if self.chunk_storage is None:
+            stored = [None] * len(chunks)
+        else:
+            stored = [self.chunk_storage.read_chunk(chunk.chunk_x, chunk.chunk_y) for chunk in chunks]
+        missing = [chunk for chunk, result in zip(chunks, stored) if result is None]
+        tree_parts = []
+        if missing:
+            coords = [(chunk.chunk_x, chunk.chunk_y) for chunk in missing]
+            biome_maps = self.generator.terrain.chunk_biomes(coords)
+            for chunk, biome_map in zip(missing, biome_maps):
+                chunk.biome_map = biome_map
+            generated_tiles, generated_trees = self.detail.generate(coords, biome_maps)
+            generated = iter(generated_tiles)
+            stored = [result if result is not None else (next(generated), None) for result in stored]
+            tree_parts.append(generated_trees)
+        tree_parts += [trees for _, trees in stored if trees is not None]
+        tiles = np.stack([chunk_tiles for chunk_tiles, _ in stored])
+        trees = tuple(np.concatenate([part[column] for part in tree_parts]) for column in range(3))
+        return tiles, trees
+
+    def get_biome_map(self, chunk: Chunk):
+        """Per-tile biome IDs of a chunk (see worldgen.terrain.BIOME_NAMES), sampled once and cached."""
+        if chunk.biome_map is None:
+            chunk.biome_map = self.generator.terrain.chunk_biomes([(chunk.chunk_x, chunk.chunk_y)])[0]
+        return chunk.biome_map
+
+    def _chunk_random(self, chunk: Chunk):
+        """A random generator that depends only on the seed and chunk, so chunks regenerate identically."""
+        return random.Random(f"{self.seed}:{chunk.chunk_x}:{chunk.chunk_y}")
+
+    def _get_delta(self, chunk_x, chunk_y):
+        """Returns the chunk's delta for recording a change, marking it dirty for autosave."""
+        self.dirty_chunks.add((chunk_x, chunk_y))
+        delta = self.deltas.get((chunk_x, chunk_y))
+        if delta is None:
+            delta = self.deltas[(chunk_x, chunk_y)] = ChunkDelta()
+        return delta
+
+    def _apply_delta(self, chunk: Chunk):
+        """Replays saved modifications onto a freshly generated chunk."""
+        delta = self.deltas.get((chunk.chunk_x, chunk.chunk_y))
+        if delta is None:
+            return
+        if delta.tiles:
+            chunk.tiles.ravel()[list(delta.tiles.keys())] = list(delta.tiles.values())
+        origin_x, origin_y = chunk.chunk_x * CHUNK_SIZE, chunk.chunk_y * CHUNK_SIZE
+        for local_index, hp in delta.trees.items():
+            # Only trees have deltas; an NPC standing on a felled tree's tile must not match
+            index = self.entities.index_at(origin_x + local_index % CHUNK_SIZE, origin_y + local_index // CHUNK_SIZE,
+                                           kinds=TREE_KIND_IDS)
+            if index is None:
+                continue
+            if hp <= 0:
+                self.entities.remove(index)
+            else:
+                self.entities.hp[index] = hp
+        if chunk.village:
+            for building_index in delta.decorated_buildings:
+                chunk.village.buildings[building_index].interior_decorated = True
+
+    def generate_chunks(self, chunks):
+        """Generates several chunks at once, running the terrain and detail stages once for the batch."""
+        batch = []
+        for chunk in chunks:
+            if chunk.is_generated:
+                continue
+            if chunk.poi_type == "village":
+                self._generate_chunk_detail(chunk)
+            else:
+                batch.append(chunk)
+
+        if batch:
+            tiles, trees = self._generate_detail(batch)
+            if len(trees[0]):
+                self.entities.add_many(*trees)
+            for chunk, chunk_tiles in zip(batch, tiles):
+                self._finish_chunk(chunk, chunk_tiles)
 
     def _generate_village_layout(self, chunk: Chunk):
-        tiles = [[Tile(TILE_DEFINITIONS["plains"]["char"], TILE_DEFINITIONS["plains"]["color"], TILE_DEFINITIONS["plains"]["passable"], TILE_DEFINITIONS["plains"]["name"]) for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
+        tiles = np.full((CHUNK_SIZE, CHUNK_SIZE), tile_id("plains"), dtype=TILE_ID_DTYPE)
 
         # Generate a more structured road network
         # Main road down the middle
         road_y = CHUNK_SIZE // 2
-        for x in range(CHUNK_SIZE):
-            tiles[road_y][x] = Tile(TILE_DEFINITIONS["road"]["char"], TILE_DEFINITIONS["road"]["color"], TILE_DEFINITIONS["road"]["passable"], TILE_DEFINITIONS["road"]["name"])
+        tiles[road_y, :] = tile_id("road")
         
         # Cross road
         road_x = CHUNK_SIZE // 2
-        for y in range(CHUNK_SIZE):
-            tiles[y][road_x] = Tile(TILE_DEFINITIONS["road"]["char"], TILE_DEFINITIONS["road"]["color"], TILE_DEFINITIONS["road"]["passable"], TILE_DEFINITIONS["road"]["name"])
+        tiles[:, road_x] = tile_id("road")
 
         # Place well at the center intersection
         well_x, well_y = road_x, road_y
-        tiles[well_y][well_x] = Tile(TILE_DEFINITIONS["well"]["char"], TILE_DEFINITIONS["well"]["color"], TILE_DEFINITIONS["well"]["passable"], TILE_DEFINITIONS["well"]["name"])
+        tiles[well_y, well_x] = tile_id("well")
 
         # Generate Capital Hall
         capital_hall_w, capital_hall_h = 9, 7
-        capital_hall_x = road_x - capital_hall_w - 2 # To the left of the main road
+        capital_hall_x = max(0, road_x - capital_hall_w - 2) # To the left of the main road, inside the chunk
         capital_hall_y = road_y - capital_hall_h // 2
         capital_hall = Building(capital_hall_x, capital_hall_y, capital_hall_w, capital_hall_h, "capital_hall")
         chunk.village.add_building(capital_hall)
-        self._draw_building(tiles, capital_hall, "capital_hall_wall")
+        stamp_prefab(tiles, capital_hall)
 
         # Generate Jail
         jail_w, jail_h = 7, 5
@@ -406,7 +692,7 @@ class World:
         jail_y = road_y - jail_h // 2
         jail = Building(jail_x, jail_y, jail_w, jail_h, "jail")
         chunk.village.add_building(jail)
-        self._draw_building(tiles, jail, "jail_bars")
+        stamp_prefab(tiles, jail)
 
         # Generate Sheriff's Office
         sheriff_office_w, sheriff_office_h = 7, 5
@@ -414,65 +700,31 @@ class World:
         sheriff_office_y = jail_y + jail_h + 2
         sheriff_office = Building(sheriff_office_x, sheriff_office_y, sheriff_office_w, sheriff_office_h, "sheriff_office")
         chunk.village.add_building(sheriff_office)
-        self._draw_building(tiles, sheriff_office, "sheriff_office_wall")
+        stamp_prefab(tiles, sheriff_office)
 
         # Generate a few regular houses
-        num_houses = random.randint(3, 5)
+        rng = self._chunk_random(chunk)
+        # Roads and existing buildings (plus a one-tile gap around them) are off limits
+        occupied = tiles == tile_id("road")
+        for existing_building in chunk.village.buildings:
+            occupied[max(0, existing_building.y - 1):existing_building.y + existing_building.height + 1,
+                     max(0, existing_building.x - 1):existing_building.x + existing_building.width + 1] = True
+
+        num_houses = rng.randint(3, 5)
         for _ in range(num_houses):
-            w, h = random.randint(5, 9), random.randint(5, 9)
-            attempts = 0
-            while attempts < 100:
-                bx = random.randint(1, CHUNK_SIZE - w - 1)
-                by = random.randint(1, CHUNK_SIZE - h - 1)
-
-                # Avoid placing on roads or existing buildings
-                overlap = False
-                for i in range(h):
-                    for j in range(w):
-                        if tiles[by + i][bx + j].char == TILE_DEFINITIONS["road"]["char"]:
-                            overlap = True
-                            break
-                    if overlap: break
-                
-                for existing_building in chunk.village.buildings:
-                    if not (bx + w < existing_building.x or bx > existing_building.x + existing_building.width or 
-                            by + h < existing_building.y or by > existing_building.y + existing_building.height):
-                        overlap = True
-                        break
-                
-                if not overlap:
-                    break
-                attempts += 1
-            
-            if attempts == 100:
+            w, h = rng.randint(5, 9), rng.randint(5, 9)
+            positions = find_free_positions(occupied, w, h, margin=1)
+            if not positions:
                 continue
+            bx, by = rng.choice(positions)
 
             house = Building(bx, by, w, h, "house")
             chunk.village.add_building(house)
-            self._draw_building(tiles, house, "wood_wall")
+            stamp_prefab(tiles, house)
+            occupied[max(0, by - 1):by + h + 1, max(0, bx - 1):bx + w + 1] = True
 
         return tiles
 
-    def _draw_building(self, tiles, building, wall_tile_key):
-        for i in range(building.height):
-            for j in range(building.width):
-                is_border = i == 0 or i == building.height - 1 or j == 0 or j == building.width - 1
-                is_window = (i == 1 and j == 0) or (i == 1 and j == building.width - 1) or \
-                            (i == building.height - 2 and j == 0) or (i == building.height - 2 and j == building.width - 1)
-
-                if is_border:
-                    tiles[building.y + i][building.x + j] = Tile(TILE_DEFINITIONS[wall_tile_key]["char"], TILE_DEFINITIONS[wall_tile_key]["color"], TILE_DEFINITIONS[wall_tile_key]["passable"], TILE_DEFINITIONS[wall_tile_key]["name"])
-                elif is_window and building.building_type == "house": # Only houses have windows for now
-                    tiles[building.y + i][building.x + j] = Tile(TILE_DEFINITIONS["window"]["char"], TILE_DEFINITIONS["window"]["color"], TILE_DEFINITIONS["window"]["passable"], TILE_DEFINITIONS["window"]["name"])
-                else:
-                    tiles[building.y + i][building.x + j] = Tile(TILE_DEFINITIONS["wood_floor"]["char"], TILE_DEFINITIONS["wood_floor"]["color"], TILE_DEFINITIONS["wood_floor"]["passable"], TILE_DEFINITIONS["wood_floor"]["name"])
-
-        # Place door for houses and capital hall
-        if building.building_type in ["house", "capital_hall", "sheriff_office", "jail"]:
-            door_x = building.x + building.width // 2
-            door_y = building.y + building.height - 1 # Bottom wall
-            tiles[door_y][door_x] = Tile(TILE_DEFINITIONS["door"]["char"], TILE_DEFINITIONS["door"]["color"], TILE_DEFINITIONS["door"]["passable"], TILE_DEFINITIONS["door"]["name"])
-
     def get_tile_at(self, x, y):
         if not (0 <= x < WORLD_WIDTH and 0 <= y < WORLD_HEIGHT):
             return None
@@ -485,7 +737,118 @@ class World:
         chunk = self.chunks[chunk_y][chunk_x]
         if not chunk.is_generated:
             self._generate_chunk_detail(chunk)
-        return chunk.tiles[local_y][local_x]
+        return TILES[chunk.tiles[local_y, local_x]]
+
+    def set_tile(self, x, y, tile_key):
+        """Replaces the tile at a world position, generating its chunk first if needed."""
+        if not (0 <= x < WORLD_WIDTH and 0 <= y < WORLD_HEIGHT):
+            return
+        chunk = self.chunks[y // CHUNK_SIZE][x // CHUNK_SIZE]
+        if not chunk.is_generated:
+            self._generate_chunk_detail(chunk)
+        chunk.tiles[y % CHUNK_SIZE, x % CHUNK_SIZE] = tile_id(tile_key)
+        self._get_delta(chunk.chunk_x, chunk.chunk_y).tiles[(y % CHUNK_SIZE) * CHUNK_SIZE + x % CHUNK_SIZE] = tile_id(tile_key)
+        self.chunk_versions[chunk.chunk_y, chunk.chunk_x] += 1
+
+    # --- Region Queries ---
+    def get_tile_region(self, x, y, width, height, generate=True):
+        """Returns a TileRegion for any rectangle, copied chunk by chunk with slice operations.
+
+        With generate=True missing chunks are generated first (all of them in one batched
+        call); with generate=False they are left out and marked unknown, so scans never
+        trigger generation.
+        """
+        tile_ids = np.zeros((height, width), dtype=TILE_ID_DTYPE)
+        known = np.zeros((height, width), dtype=bool)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, WORLD_WIDTH), min(y + height, WORLD_HEIGHT)
+        if x0 >= x1 or y0 >= y1:
+            return TileRegion(x, y, tile_ids, known)
+
+        chunks = [self.chunks[chunk_y][chunk_x]
+                  for chunk_y in range(y0 // CHUNK_SIZE, (y1 - 1) // CHUNK_SIZE + 1)
+                  for chunk_x in range(x0 // CHUNK_SIZE, (x1 - 1) // CHUNK_SIZE + 1)]
+        if generate:
+            self.generate_chunks(chunks)
+        for chunk in chunks:
+            if not chunk.is_generated:
+                continue
+            # Copy the overlap between this chunk and the requested rectangle
+            origin_x, origin_y = chunk.chunk_x * CHUNK_SIZE, chunk.chunk_y * CHUNK_SIZE
+            sx0, sx1 = max(x0, origin_x), min(x1, origin_x + CHUNK_SIZE)
+            sy0, sy1 = max(y0, origin_y), min(y1, origin_y + CHUNK_SIZE)
+            tile_ids[sy0 - y:sy1 - y, sx0 - x:sx1 - x] = \
+                chunk.tiles[sy0 - origin_y:sy1 - origin_y, sx0 - origin_x:sx1 - origin_x]
+            known[sy0 - y:sy1 - y, sx0 - x:sx1 - x] = True
+        return TileRegion(x, y, tile_ids, known)
+
+    def get_walkable_region(self, x, y, width, height, generate=True):
+        """Returns a (height, width) bool array of tiles that are passable and free of blocking entities."""
+        walkable = self.get_tile_region(x, y, width, height, generate).passable
+        store = self.entities
+        indices = store.query_rect(x, y, width, height)
+        blocking = indices[~KIND_PASSABLE[store.kind[indices]]]
+        walkable[store.y[blocking] - y, store.x[blocking] - x] = False
+        return walkable
+
+    def tile_version(self, x, y, width, height):
+        """Sums the versions of the chunks overlapping a rectangle: it changes whenever any of their tiles do."""
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, WORLD_WIDTH), min(y + height, WORLD_HEIGHT)
+        if x0 >= x1 or y0 >= y1:
+            return 0
+        return int(self.chunk_versions[y0 // CHUNK_SIZE:(y1 - 1) // CHUNK_SIZE + 1,
+                                       x0 // CHUNK_SIZE:(x1 - 1) // CHUNK_SIZE + 1].sum())
+
+    def get_transparency_map(self, x, y, width, height):
+        """Returns a (height, width) bool array of see-through tiles. Out-of-bounds tiles are opaque."""
+        return self.get_tile_region(x, y, width, height).transparent
+
+    def set_tiles(self, xs, ys, tile_ids):
+        """Replaces many tiles at once; positions outside the world are ignored."""
+        xs, ys, tile_ids = np.asarray(xs), np.asarray(ys), np.asarray(tile_ids, dtype=TILE_ID_DTYPE)
+        inside = (xs >= 0) & (xs < WORLD_WIDTH) & (ys >= 0) & (ys < WORLD_HEIGHT)
+        xs, ys, tile_ids = xs[inside], ys[inside], tile_ids[inside]
+        chunk_xs, chunk_ys = xs // CHUNK_SIZE, ys // CHUNK_SIZE
+        for chunk_x, chunk_y in set(zip(chunk_xs.tolist(), chunk_ys.tolist())):
+            chunk = self.chunks[chunk_y][chunk_x]
+            if not chunk.is_generated:
+                self._generate_chunk_detail(chunk)
+            in_chunk = (chunk_xs == chunk_x) & (chunk_ys == chunk_y)
+            local_x, local_y = xs[in_chunk] % CHUNK_SIZE, ys[in_chunk] % CHUNK_SIZE
+            chunk.tiles[local_y, local_x] = tile_ids[in_chunk]
+            delta = self._get_delta(chunk_x, chunk_y)
+            delta.tiles.update(zip((local_y * CHUNK_SIZE + local_x).tolist(), tile_ids[in_chunk].tolist()))
+            self.chunk_versions[chunk_y, chunk_x] += 1
+
+    def get_entity_at(self, x, y):
+        """Returns an object-like view of the entity at a position, or None."""
+        index = self.entities.index_at(x, y)
+        if index is None:
+            return None
+        entity = self.entities.get(index)
+        if entity.kind_name in TREE_KINDS:
+            return self.entities.get(index, Tree)
+        return entity
+
+    def is_walkable(self, x, y):
+        """True if the tile is passable and no blocking entity (like a tree) stands on it."""
+        tile = self.get_tile_at(x, y)
+        return bool(tile and tile.passable and self.entities.index_at(x, y, blocking_only=True) is None)
+
+    def harvest_tree(self, tree: Tree):
+        """Chops at a tree; once its HP runs out its drops go to the player's inventory."""
+        tree.hp -= 1
+        self._get_delta(tree.x // CHUNK_SIZE, tree.y // CHUNK_SIZE).trees[
+            (tree.y % CHUNK_SIZE) * CHUNK_SIZE + tree.x % CHUNK_SIZE] = tree.hp
+        if tree.hp > 0:
+            print(f"You chop at the {tree.name}.")
+            return
+        for item, quantity in tree.drops.items():
+            self.player.inventory[item] = self.player.inventory.get(item, 0) + quantity
+        drops_text = ", ".join(f"{quantity} {item}" for item, quantity in tree.drops.items())
+        print(f"You felled the {tree.name} and got {drops_text}.")
+        self.entities.remove(tree.index)
 
     def get_building_at(self, x, y):
         chunk_x, chunk_y = x // CHUNK_SIZE, y // CHUNK_SIZE
@@ -502,6 +865,12 @@ class World:
         new_x, new_y = self.player.x + dx, self.player.y + dy
         destination_tile = self.get_tile_at(new_x, new_y)
 
+        # Bumping into a tree harvests it instead of moving
+        entity = self.get_entity_at(new_x, new_y)
+        if isinstance(entity, Tree):
+            self.harvest_tree(entity)
+            return
+
         if destination_tile and destination_tile.passable:
             self.player.x, self.player.y = new_x, new_y
 
@@ -510,8 +879,8 @@ class World:
             if building and not building.interior_decorated:
                 self.decorate_building_interior(building)
 
-            # Check if the player moved onto a flower
-            if destination_tile.char == ord('*'):
+            # Check if the player moved onto a flower (by tile, not glyph: snow is drawn as '*' too)
+            if destination_tile is TILES[tile_id("flower")]:
                 # Add a flower to the player's inventory
                 current_flowers = self.player.inventory.get("flower", 0)
                 self.player.inventory["flower"] = current_flowers + 1
@@ -519,9 +888,7 @@ class World:
                 print(f"You picked a flower! You now have {self.player.inventory['flower']} flowers.")
                 
                 # Replace the flower tile with a plains tile
-                chunk_x, chunk_y = new_x // CHUNK_SIZE, new_y // CHUNK_SIZE
-                local_x, local_y = new_x % CHUNK_SIZE, new_y % CHUNK_SIZE
-                self.chunks[chunk_y][chunk_x].tiles[local_y][local_x] = Tile(TILE_DEFINITIONS["plains"]["char"], TILE_DEFINITIONS["plains"]["color"], TILE_DEFINITIONS["plains"]["passable"], TILE_DEFINITIONS["plains"]["name"])
+                self.set_tile(new_x, new_y, "plains")
 
     def craft_item(self, item_key: str):
         """Crafts an item if the player has the required resources."""
@@ -570,4 +937,4 @@ class World:
             else:
                 print(f"You can't use the {item_key} in that way.")
         else:
-            print(f"You don't have any {item_def['name']} to use.")
\ No newline at end of file
+            print(f"You don't have any {item_key} to use.")
\ No newline at end of file
@@ -1,15 +1,19 @@
-class NPC:
-    def __init__(self, x, y, name="NPC", dialogue=None, personality="normal", family_ties="none", attitude_to_player="indifferent"):
-        self.x = x
-        self.y = y
+from entities.store import EntityView
+
+class NPC(EntityView):
+    """An NPC's position, kind and HP live in the EntityStore; its dialogue data stays on the object."""
+    def __init__(self, store, x, y, name="NPC", dialogue=None, personality="normal", family_ties="none", attitude_to_player="indifferent", npc_id=None, home_chunk=None, role=None, kind="villager"):
+        super().__init__(store, store.add(kind, x, y))
         self.name = name
-        self.char = ord('N') # Default character for NPC
-        self.color = (0, 255, 0) # Green color for NPC
         self.dialogue = dialogue if dialogue is not None else ["Hello!"] # List of dialogue options
         self.personality = personality
         self.family_ties = family_ties
         self.attitude_to_player = attitude_to_player
         self.last_speech_time = 0 # Timestamp of last speech
+        self.npc_id = npc_id # Stable identifier, survives LOD promotion/demotion
+        self.home_chunk = home_chunk # (chunk_x, chunk_y) the NPC lives in, None for wanderers
+        self.role = role
+        self.activity = "leisure" # Current schedule activity
 
     def get_dialogue(self):
-        return self.dialogue
\ No newline at end of file
+        return self.dialogue
@@ -0,0 +1,156 @@
+# entities/store.py
+import numpy as np
+from data.entities import ENTITY_KINDS, TREE_KINDS
+
+# --- Kind Lookup Tables (indexed by kind ID) ---
+KIND_NAMES = list(ENTITY_KINDS.keys())
+KIND_IDS = {name: kind_id for kind_id, name in enumerate(KIND_NAMES)}
+KIND_CHARS = np.array([ord(ENTITY_KINDS[name]["char"]) for name in KIND_NAMES], dtype=np.int32)
+KIND_COLORS = np.array([ENTITY_KINDS[name]["color"] for name in KIND_NAMES], dtype=np.uint8)
+KIND_PASSABLE = np.array([ENTITY_KINDS[name]["passable"] for name in KIND_NAMES], dtype=bool)
+KIND_MOBILE = np.array([ENTITY_KINDS[name]["mobile"] for name in KIND_NAMES], dtype=bool)
+KIND_MAX_HP = np.array([ENTITY_KINDS[name]["max_hp"] for name in KIND_NAMES], dtype=np.int16)
+KIND_DROPS = [ENTITY_KINDS[name]["drops"] for name in KIND_NAMES]
+TREE_KIND_IDS = np.array([KIND_IDS[name] for name in TREE_KINDS], dtype=np.uint8)
+# Other players, as the server sends them to clients. Never a real kind ID.
+AVATAR_KIND = 255
+assert len(KIND_NAMES) < AVATAR_KIND
+
+# --- Entity States ---
+STATE_FREE = 0    # Row is unused and may be recycled
+STATE_ACTIVE = 1
+
+class EntityStore:
+    """Struct-of-arrays entity storage: one NumPy column per field, one row per entity."""
+    def __init__(self, capacity=1024):
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.kind = np.zeros(capacity, dtype=np.uint8)
+        self.state = np.zeros(capacity, dtype=np.uint8)
+        self.hp = np.zeros(capacity, dtype=np.int16)
+        self.size = 0 # Rows in use, including freed ones below it
+        self.free_rows = []
+
+    @property
+    def capacity(self):
+        return len(self.x)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.state[:self.size] != STATE_FREE))
+
+    def _grow(self, needed):
+        new_capacity = self.capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        for column in ("x", "y", "kind", "state", "hp"):
+            old = getattr(self, column)
+            grown = np.zeros(new_capacity, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, column, grown)
+
+    def add(self, kind_name, x, y):
+        """Adds one entity and returns its row index."""
+        if self.free_rows:
+            index = self.free_rows.pop()
+        else:
+            if self.size >= self.capacity:
+                self._grow(self.size + 1)
+            index = self.size
+            self.size += 1
+        kind_id = KIND_IDS[kind_name]
+        self.x[index], self.y[index] = x, y
+        self.kind[index] = kind_id
+        self.state[index] = STATE_ACTIVE
+        self.hp[index] = KIND_MAX_HP[kind_id]
+        return index
+
+    def add_many(self, kind_ids, xs, ys):
+        """Appends a batch of entities in one go and returns their row indices."""
+        count = len(kind_ids)
+        if self.size + count > self.capacity:
+            self._grow(self.size + count)
+        indices = np.arange(self.size, self.size + count)
+        self.x[indices], self.y[indices] = xs, ys
+        self.kind[indices] = kind_ids
+        self.state[indices] = STATE_ACTIVE
+        self.hp[indices] = KIND_MAX_HP[kind_ids]
+        self.size += count
+        return indices
+
+    def remove(self, index):
+        self.state[index] = STATE_FREE
+        self.free_rows.append(int(index))
+
+    def query_rect(self, x, y, width, height):
+        """Returns the row indices of active entities inside a rectangle."""
+        xs, ys = self.x[:self.size], self.y[:self.size]
+        mask = (self.state[:self.size] != STATE_FREE) & \
+            (xs >= x) & (xs < x + width) & (ys >= y) & (ys < y + height)
+        return np.flatnonzero(mask)
+
+    def index_at(self, x, y, blocking_only=False, kinds=None):
+        """Returns the row index of an active entity at a position, or None.
+
+        kinds, if given, is an array of kind IDs the entity must be one of.
+        """
+        mask = (self.state[:self.size] != STATE_FREE) & (self.x[:self.size] == x) & (self.y[:self.size] == y)
+        if blocking_only:
+            mask &= ~KIND_PASSABLE[self.kind[:self.size]]
+        if kinds is not None:
+            mask &= np.isin(self.kind[:self.size], kinds)
+        indices = np.flatnonzero(mask)
+        return int(indices[0]) if len(indices) else None
+
+    def get(self, index, view_class=None):
+        """Returns an object-like view of one row for one-off interactions."""
+        return (view_class or EntityView)(self, index)
+
+class EntityView:
+    """Object-like accessor for a single EntityStore row."""
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def x(self):
+        return int(self.store.x[self.index])
+
+    @x.setter
+    def x(self, value):
+        self.store.x[self.index] = value
+
+    @property
+    def y(self):
+        return int(self.store.y[self.index])
+
+    @y.setter
+    def y(self, value):
+        self.store.y[self.index] = value
+
+    @property
+    def hp(self):
+        return int(self.store.hp[self.index])
+
+    @hp.setter
+    def hp(self, value):
+        self.store.hp[self.index] = value
+
+    @property
+    def kind_name(self):
+        return KIND_NAMES[self.store.kind[self.index]]
+
+    @property
+    def char(self):
+        return int(KIND_CHARS[self.store.kind[self.index]])
+
+    @property
+    def color(self):
+        return tuple(int(c) for c in KIND_COLORS[self.store.kind[self.index]])
+
+    @property
+    def passable(self):
+        return bool(KIND_PASSABLE[self.store.kind[self.index]])
+
+    @property
+    def drops(self):
+        return KIND_DROPS[self.store.kind[self.index]]
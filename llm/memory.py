@@ -0,0 +1,77 @@
+# llm/memory.py
+from config import MEMORY_TOKEN_BUDGET, MEMORY_RECENT_TOKENS, MEMORY_KEEP_TURNS, MEMORY_SUMMARY_TOKENS
+from data.prompts import LLM_PROMPTS
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token), good enough for budgeting prompts."""
+    return len(text) // 4 + 1
+
+class ConversationMemory:
+    """What an NPC remembers: a rolling summary plus the most recent turns verbatim.
+
+    Once the recent turns pass MEMORY_RECENT_TOKENS the older ones are folded into the
+    summary by a background LLM request, so prompts stay about the same size however long
+    the game runs.
+    """
+    def __init__(self, summary="", turns=None):
+        self.summary = summary
+        self.turns = turns if turns is not None else [] # [speaker, text] pairs, oldest first
+        self.folding = 0 # Oldest turns currently being summarized
+        self.version = 0 # Bumped on every change, used by autosave
+
+    def add_turn(self, speaker, text):
+        self.turns.append([speaker, text])
+        self.version += 1
+
+    def _turn_tokens(self, turns):
+        return sum(estimate_tokens(f"{speaker}: {text}") for speaker, text in turns)
+
+    def needs_summary(self):
+        return not self.folding and len(self.turns) > MEMORY_KEEP_TURNS and \
+            self._turn_tokens(self.turns) > MEMORY_RECENT_TOKENS
+
+    def summary_prompt(self, name):
+        """Marks the turns to fold and returns the prompt asking for the new summary."""
+        self.folding = len(self.turns) - MEMORY_KEEP_TURNS
+        conversation = "\n".join(f"{speaker}: {text}" for speaker, text in self.turns[:self.folding])
+        return LLM_PROMPTS["npc_memory_summary"].format(
+            name=name,
+            summary=self.summary or "(nothing yet)",
+            conversation=conversation,
+            max_words=MEMORY_SUMMARY_TOKENS * 3 // 4,
+        )
+
+    def finish_summary(self, response):
+        """Replaces the folded turns with the new summary; a failed summary keeps them for a retry."""
+        if response:
+            self.summary = response.strip()
+            del self.turns[:self.folding]
+            self.version += 1
+        self.folding = 0
+
+    def prompt_context(self, budget=MEMORY_TOKEN_BUDGET):
+        """Memory text for a dialogue prompt, capped at budget tokens.
+
+        The newest turns are kept first; if summarization falls behind the oldest turns
+        are left out rather than letting the prompt grow.
+        """
+        lines = []
+        used = 0
+        if self.summary:
+            summary = self.summary[:MEMORY_SUMMARY_TOKENS * 4]
+            lines.append(f"What you remember: {summary}")
+            used += estimate_tokens(lines[0])
+        recent = []
+        for speaker, text in reversed(self.turns):
+            line = f"{speaker}: {text}"
+            used += estimate_tokens(line)
+            if used > budget:
+                break
+            recent.append(line)
+        if recent:
+            lines.append("Recent conversation:")
+            lines.extend(reversed(recent))
+        return "\n".join(lines)
+
+    def record(self):
+        return {"summary": self.summary, "turns": [list(turn) for turn in self.turns]}
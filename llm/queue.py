@@ -0,0 +1,133 @@
+# llm/queue.py
+import queue
+import threading
+import time
+from config import LLM_WORKERS, LLM_MAX_PENDING
+from llm.memory import estimate_tokens
+
+class LLMRequestQueue:
+    """Runs LLM calls on a fixed number of worker threads with a bounded backlog.
+
+    Responses come back through poll(), so callbacks run on the caller's thread and
+    may safely touch the world.
+    """
+    def __init__(self, call, workers=LLM_WORKERS, max_pending=LLM_MAX_PENDING):
+        self.call = call
+        self.requests = queue.Queue(maxsize=max_pending)
+        self.results = queue.Queue()
+        self.in_flight = 0 # Submitted but not yet applied by poll()
+        self.stats = {"submitted": 0, "completed": 0, "rejected": 0, "call_seconds": 0.0}
+        self.kind_stats = {} # Request kind -> prompt size and latency totals
+        self.workers = workers
+        self.threads = [] # Started on the first submit, so idle queues cost nothing
+        self.closed = False
+
+    def _start(self):
+        self.threads = [threading.Thread(target=self._worker, daemon=True, name=f"llm-{i}") for i in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, prompt, on_result, block=True, kind="other", call=None):
+        """Queues a prompt; on_result(response) runs in poll(). Returns False if the backlog is full and block is False.
+
+        kind groups the request in kind_stats, e.g. "dialogue" or "summary". call replaces the
+        queue's call function for this request, e.g. for structured JSON prompts.
+        """
+        if self.closed:
+            # Nothing serves the queue any more: answer right away, like a failed call
+            self.results.put((on_result, "", kind, 0.0))
+        else:
+            if not self.threads:
+                self._start()
+            try:
+                self.requests.put((prompt, on_result, kind, call or self.call), block=block)
+            except queue.Full:
+                self.stats["rejected"] += 1
+                return False
+        self.in_flight += 1
+        self.stats["submitted"] += 1
+        tokens = estimate_tokens(prompt)
+        kind_stats = self.kind_stats.setdefault(kind, {
+            "requests": 0, "completed": 0, "prompt_tokens": 0, "last_prompt_tokens": 0, "max_prompt_tokens": 0,
+            "call_seconds": 0.0, "max_call_seconds": 0.0,
+        })
+        kind_stats["requests"] += 1
+        kind_stats["prompt_tokens"] += tokens
+        kind_stats["last_prompt_tokens"] = tokens
+        kind_stats["max_prompt_tokens"] = max(kind_stats["max_prompt_tokens"], tokens)
+        return True
+
+    def _worker(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            prompt, on_result, kind, call = request
+            start = time.perf_counter()
+            response = ""
+            try:
+                response = call(prompt)
+            except Exception as e:
+                print(f"LLM request failed: {e}")
+            finally:
+                # Always answer, so in_flight goes down and drain() returns
+                self.results.put((on_result, response, kind, time.perf_counter() - start))
+
+    def poll(self, max_results=None):
+        """Applies finished responses on the calling thread and returns how many were applied."""
+        applied = 0
+        while max_results is None or applied < max_results:
+            try:
+                self._apply(self.results.get_nowait())
+            except queue.Empty:
+                break
+            applied += 1
+        return applied
+
+    def drain(self):
+        """Blocks until every submitted request has been applied."""
+        while self.in_flight:
+            self._apply(self.results.get())
+
+    def _apply(self, result):
+        on_result, response, kind, elapsed = result
+        self.in_flight -= 1
+        self.stats["completed"] += 1
+        self.stats["call_seconds"] += elapsed
+        kind_stats = self.kind_stats[kind]
+        kind_stats["completed"] += 1
+        kind_stats["call_seconds"] += elapsed
+        kind_stats["max_call_seconds"] = max(kind_stats["max_call_seconds"], elapsed)
+        on_result(response)
+
+    def prompt_report(self):
+        """Mean and max prompt tokens and mean latency per request kind."""
+        return {
+            kind: {
+                "requests": stats["requests"],
+                "mean_prompt_tokens": stats["prompt_tokens"] / stats["requests"],
+                "last_prompt_tokens": stats["last_prompt_tokens"],
+                "max_prompt_tokens": stats["max_prompt_tokens"],
+                "mean_call_seconds": stats["call_seconds"] / stats["completed"] if stats["completed"] else 0.0,
+                "max_call_seconds": stats["max_call_seconds"],
+            }
+            for kind, stats in self.kind_stats.items()
+        }
+
+    def close(self, wait=True):
+        """Stops the workers. Queued requests that have not started are dropped.
+
+        Requests submitted afterwards get an empty response from the next poll().
+        """
+        self.closed = True
+        while True:
+            try:
+                if self.requests.get_nowait() is not None:
+                    self.in_flight -= 1 # Dropped, so drain() must not wait for it
+            except queue.Empty:
+                break
+        for _ in self.threads:
+            self.requests.put(None)
+        if wait:
+            for thread in self.threads:
+                thread.join()
@@ -0,0 +1,216 @@
+# llm/structured.py
+import copy
+import json
+import re
+import threading
+from config import LLM_MAX_RETRIES, LLM_RETRY_BUDGET
+from data.prompts import LLM_SCHEMAS
+
+# --- Local Repair ---
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+def _close_brackets(text):
+    """Closes strings, arrays and objects left open by a truncated response."""
+    stack = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+    return text + ('"' if in_string else "") + "".join(reversed(stack))
+
+def _object_end(text, start):
+    """Index just past the object opened at start, or None if the response was cut off inside it."""
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return None
+
+def repair_json(text):
+    """Fixes the usual textual defects of model JSON: code fences, prose around the object,
+    smart or single quotes, trailing commas, Python literals and truncation."""
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find("{")
+    if start != -1:
+        # Keep only the first complete object; prose or further objects after it may hold braces too
+        end = _object_end(text, start)
+        text = text[start:end]
+    text = text.translate(_SMART_QUOTES)
+    if '"' not in text:
+        text = text.replace("'", '"')
+    text = re.sub(r"\bTrue\b", "true", re.sub(r"\bFalse\b", "false", re.sub(r"\bNone\b", "null", text)))
+    text = _close_brackets(text)
+    return _TRAILING_COMMA.sub(r"\1", text)
+
+# --- Schema Validation ---
+def _coerce(value, schema, path, errors, repairs):
+    """Returns value shaped to the schema, noting fixes in repairs and unfixable problems in errors."""
+    kind = schema.get("type")
+    if kind == "object":
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object")
+            return value
+        result = {}
+        for key, field in schema.get("properties", {}).items():
+            if key in value:
+                result[key] = _coerce(value[key], field, f"{path}.{key}", errors, repairs)
+            elif "default" in field:
+                result[key] = copy.deepcopy(field["default"])
+                repairs.append(f"{path}.{key}: filled in default")
+        for key in schema.get("required", []):
+            if key not in result:
+                errors.append(f"{path}.{key}: missing")
+        return result
+
+    if kind == "array":
+        if isinstance(value, (str, dict)):
+            value = [value]
+            repairs.append(f"{path}: wrapped single value in a list")
+        if not isinstance(value, list):
+            errors.append(f"{path}: expected a list")
+            return value
+        items = []
+        for i, item in enumerate(value):
+            item_errors = []
+            item = _coerce(item, schema.get("items", {}), f"{path}[{i}]", item_errors, repairs)
+            if item_errors:
+                repairs.append(f"{path}[{i}]: dropped ({item_errors[0]})")
+            else:
+                items.append(item)
+        if len(items) < schema.get("minItems", 0):
+            if "default" in schema:
+                repairs.append(f"{path}: filled in default")
+                return copy.deepcopy(schema["default"])
+            errors.append(f"{path}: needs at least {schema['minItems']} valid items")
+        return items
+
+    if kind == "integer":
+        if isinstance(value, bool):
+            errors.append(f"{path}: expected an integer")
+        elif isinstance(value, int):
+            return value
+        elif isinstance(value, float) and value.is_integer():
+            repairs.append(f"{path}: float to integer")
+            return int(value)
+        elif isinstance(value, str) and value.strip().lstrip("-").isdigit():
+            repairs.append(f"{path}: string to integer")
+            return int(value)
+        else:
+            errors.append(f"{path}: expected an integer")
+        return value
+
+    if kind == "string":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            repairs.append(f"{path}: number to string")
+            value = str(value)
+        if not isinstance(value, str):
+            errors.append(f"{path}: expected a string")
+            return value
+        enum = schema.get("enum")
+        if enum and value not in enum:
+            normalized = value.strip().lower().replace(" ", "_")
+            if normalized in enum:
+                repairs.append(f"{path}: normalized '{value}'")
+                return normalized
+            errors.append(f"{path}: '{value}' is not one of the allowed values")
+        return value
+    return value
+
+def parse_structured(text, schema):
+    """Parses and validates a response. Returns (value or None, repairs, errors)."""
+    repairs = []
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            value = json.loads(repair_json(text))
+        except json.JSONDecodeError as e:
+            return None, repairs, [f"invalid JSON: {e}"]
+        repairs.append("fixed JSON syntax")
+    errors = []
+    value = _coerce(value, schema, "$", errors, repairs)
+    return (None if errors else value), repairs, errors
+
+class StructuredCaller:
+    """Asks the LLM for schema-constrained JSON, repairing replies locally before retrying.
+
+    Retries are limited per request (LLM_MAX_RETRIES) and overall: all retries together may
+    not exceed LLM_RETRY_BUDGET of the requests made, so a misbehaving model cannot
+    multiply the number of slow round-trips. Safe to call from the LLM worker threads.
+    """
+    def __init__(self, call):
+        self.call = call # call(prompt, schema) -> response text
+        self.lock = threading.Lock()
+        self.stats = {} # Prompt key -> counters
+
+    def _count(self, prompt_key, counter):
+        with self.lock:
+            stats = self.stats.setdefault(prompt_key, {"requests": 0, "calls": 0, "clean": 0, "repaired": 0, "retries": 0, "failures": 0})
+            stats[counter] += 1
+
+    def _may_retry(self, prompt_key):
+        with self.lock:
+            stats = self.stats[prompt_key]
+            return stats["retries"] < max(1, LLM_RETRY_BUDGET * stats["requests"])
+
+    def request(self, prompt_key, prompt):
+        """Returns the validated response as a JSON string, or "" once the retries are used up."""
+        schema = LLM_SCHEMAS[prompt_key]
+        self._count(prompt_key, "requests")
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            if attempt:
+                if not self._may_retry(prompt_key):
+                    break
+                self._count(prompt_key, "retries")
+            self._count(prompt_key, "calls")
+            response = self.call(prompt, schema)
+            value, repairs, errors = parse_structured(response, schema)
+            if value is not None:
+                self._count(prompt_key, "repaired" if repairs else "clean")
+                return json.dumps(value)
+            print(f"Invalid {prompt_key} response ({errors[0]}): {response[:200]}")
+        self._count(prompt_key, "failures")
+        return ""
+
+    def report(self):
+        """Per prompt: requests, the share parsed clean, repaired locally or failed, and calls per request."""
+        with self.lock:
+            return {
+                prompt_key: dict(
+                    stats,
+                    failure_rate=stats["failures"] / stats["requests"],
+                    repair_rate=stats["repaired"] / stats["requests"],
+                    calls_per_request=stats["calls"] / stats["requests"],
+                )
+                for prompt_key, stats in self.stats.items() if stats["requests"]
+            }
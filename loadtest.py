@@ -0,0 +1,130 @@
+# loadtest.py
+"""Load test for the local game server.
+
+Starts a server on a free local port, connects many headless clients from a few worker
+processes and lets them wander the world, then reports the server's tick time and the
+bytes sent to each client per second.
+
+Usage: python loadtest.py --clients 32 --seconds 20 --seed 1234
+"""
+import argparse
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from cli import seed_arg
+from config import SIM_TICK_RATE, SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES
+from engine import World
+from net.client import GameClient
+from net.protocol import CMD_MOVE, CMD_TALK
+from net.server import GameServer
+from simulation.loop import FrameStats
+
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+# --- Client Processes ---
+async def _wander(client, seconds, move_rate, rng):
+    """Walks in straight runs, sending one command batch per tick like a player holding a key."""
+    tick_seconds = 1.0 / SIM_TICK_RATE
+    direction = rng.choice(DIRECTIONS)
+    end = time.perf_counter() + seconds
+    while client.connected and time.perf_counter() < end:
+        if rng.random() < move_rate * tick_seconds:
+            if rng.random() < 0.1:
+                direction = rng.choice(DIRECTIONS)
+            client.queue(CMD_MOVE, *direction)
+        if rng.random() < 0.002:
+            client.queue(CMD_TALK)
+        client.flush()
+        await asyncio.sleep(tick_seconds)
+
+async def _run_clients(port, count, seconds, move_rate, seed, view):
+    clients = [GameClient(*view) for _ in range(count)]
+    for client in clients:
+        await client.connect("127.0.0.1", port)
+    receivers = [asyncio.create_task(client.receive()) for client in clients]
+    await asyncio.gather(*(_wander(client, seconds, move_rate, random.Random(seed + client.client_id))
+                           for client in clients))
+    results = [{"origin": client.origin, "tiles": client.tiles, "updates": client.updates} for client in clients]
+    for client in clients:
+        await client.close()
+    await asyncio.gather(*receivers)
+    return results
+
+def run_clients(port, count, seconds, move_rate, seed, view):
+    """Worker process entry point: runs count headless clients and returns their final views."""
+    return asyncio.run(_run_clients(port, count, seconds, move_rate, seed, view))
+
+# --- Server ---
+async def run(world, args):
+    view = (args.view_width, args.view_height)
+    server = GameServer(world, "127.0.0.1", 0, stats_window=int((args.seconds + 10) * SIM_TICK_RATE))
+    port = await server.start()
+    ticking = asyncio.create_task(server.run())
+
+    loop = asyncio.get_running_loop()
+    groups = [len(group) for group in np.array_split(np.arange(args.clients), args.processes) if len(group)]
+    # Spawned rather than forked: this process already runs LLM and autosave threads
+    with ProcessPoolExecutor(len(groups), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [loop.run_in_executor(pool, run_clients, port, count, args.seconds, args.move_rate, args.seed + i * 1000, view)
+                   for i, count in enumerate(groups)]
+        # Measure ticks only once everyone is connected, not while the worker processes start
+        while len(server.sessions) < args.clients and not any(future.done() for future in futures):
+            await asyncio.sleep(0.05)
+        server.tick_stats = FrameStats(window=server.tick_stats.frame_times.maxlen)
+        results = [result for group in await asyncio.gather(*futures) for result in group]
+
+    server.stop()
+    await ticking
+    stats = server.stats()
+    await server.close()
+    return stats, results
+
+def check_mirrors(world, results):
+    """Counts clients whose mirrored view matches the world's tiles at their last origin."""
+    matching = 0
+    for result in results:
+        x, y = result["origin"]
+        height, width = result["tiles"].shape
+        matching += bool((world.get_tile_region(x, y, width, height).tile_ids == result["tiles"]).all())
+    return matching
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the game server with headless clients.")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1), help="Client worker processes")
+    parser.add_argument("--move-rate", type=float, default=5.0, help="Moves per second per client")
+    parser.add_argument("--view-width", type=int, default=SCREEN_WIDTH_TILES)
+    parser.add_argument("--view-height", type=int, default=SCREEN_HEIGHT_TILES)
+    parser.add_argument("--seed", type=seed_arg, default=1234)
+    parser.add_argument("--verbose", action="store_true", help="Show the game's own messages")
+    args = parser.parse_args()
+
+    world = World(seed=args.seed)
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, \
+            contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull):
+        stats, results = asyncio.run(run(world, args))
+    world.llm.close(wait=False)
+    elapsed = time.perf_counter() - start
+
+    clients = stats["clients"]
+    rates = np.array([client["bytes_per_second"] for client in clients])
+    updates = np.array([client["updates"] / client["seconds"] for client in clients])
+    print(f"{len(clients)} clients, {args.processes} processes, {args.view_width}x{args.view_height} views, {elapsed:.1f}s")
+    print(f"Ticks: {stats['ticks_per_second']:.1f}/s (target {SIM_TICK_RATE}), work {stats['work_ms']:.2f} ms mean, "
+          f"{stats['work_p95_ms']:.2f} ms p95 ({stats['work_ms'] / max(len(clients), 1):.3f} ms per client), "
+          f"{stats['over_budget']} over budget, {stats['dropped_ticks']} dropped")
+    print(f"Traffic per client: {rates.mean() / 1024:.2f} KiB/s mean, {rates.min() / 1024:.2f} min, "
+          f"{rates.max() / 1024:.2f} max ({rates.sum() / 1024:.1f} KiB/s total)")
+    print(f"Updates per client: {updates.mean():.1f}/s, {sum(client['skipped_updates'] for client in clients)} skipped "
+          f"for slow readers, {sum(client['commands'] for client in clients)} commands applied")
+    print(f"Mirrors: {check_mirrors(world, results)}/{len(results)} client views match the world")
+
+if __name__ == "__main__":
+    main()
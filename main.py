@@ -4,11 +4,18 @@ import tcod.console
 import tcod.event
 import tcod.tileset
 import os
+import sys
+import time
 from engine import World
-from config import SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES, WORLD_WIDTH, WORLD_HEIGHT
+from config import SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES, WORLD_WIDTH, WORLD_HEIGHT, SAVE_PATH, AUTOSAVE_PATH
+from config import TARGET_FPS, FRAME_BUDGET
 from data.items import ITEM_DEFINITIONS
 from rendering.console_renderer import draw, draw_info_menu
 from rendering.console_renderer import draw, draw_info_menu
+from persistence.save import save_world, load_world
+from persistence.autosave import AutosaveService
+from persistence.chunk_storage import ChunkStorage
+from simulation.loop import FixedTimestep, FrameStats
 
 def main():
     """Sets up the game and runs the main loop."""
@@ -34,7 +41,16 @@ def main():
     console = tcod.console.Console(SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES, order="F")
 
     # --- Game Initialization ---
-    world = World()
+    # A pregenerated world (see pregen.py) can be passed as "python main.py <world>.dat"
+    chunk_storage = None
+    if len(sys.argv) > 1:
+        chunks_path = os.path.splitext(sys.argv[1])[0] + ".chunks"
+        if os.path.exists(chunks_path):
+            chunk_storage = ChunkStorage(chunks_path)
+        world = load_world(sys.argv[1], chunk_storage)
+    else:
+        world = World()
+    autosave = AutosaveService(world, AUTOSAVE_PATH)
 
     # --- Main Game Loop (using tcod's context manager) ---
     with tcod.context.new(
@@ -44,17 +60,22 @@ def main():
         title="This is Life",
         vsync=True,
     ) as context:
+        timestep = FixedTimestep()
+        frame_stats = FrameStats()
+        frame_seconds = 1.0 / TARGET_FPS
+        last_frame = time.perf_counter()
         while True:
-            # --- Drawing ---
-            draw(console, world)
-            # Handle NPC speech
-            world._handle_npc_speech()
-            # Update the screen
-            context.present(console)
-            # --- Event Handling ---
-            for event in tcod.event.wait():
+            frame_start = time.perf_counter()
+            frame_time = frame_start - last_frame
+            last_frame = frame_start
+            ticks = timestep.advance(frame_time)
+
+            # --- Event Handling (non-blocking) ---
+            for event in tcod.event.get():
                 context.convert_event(event)
                 if isinstance(event, tcod.event.Quit):
+                    world.llm.close(wait=False)
+                    autosave.close() # Let an in-progress autosave finish writing
                     return
                 if isinstance(event, tcod.event.MouseMotion):
                     world.mouse_x = int(event.tile.x)
@@ -76,9 +97,42 @@ def main():
                             print(f"You took 5 damage! Current HP: {world.player.hp}")
                         elif event.sym == tcod.event.KeySym.T:
                             world.talk_to_npc()
+                        elif event.sym == tcod.event.KeySym.F5:
+                            size = save_world(world, SAVE_PATH)
+                            world.add_message_to_chat_log(f"Game saved ({size} bytes).")
+                        elif event.sym == tcod.event.KeySym.F9:
+                            if os.path.exists(SAVE_PATH):
+                                autosave.close()
+                                world.llm.close(wait=False)
+                                world = load_world(SAVE_PATH, chunk_storage)
+                                autosave = AutosaveService(world, AUTOSAVE_PATH)
+                                world.add_message_to_chat_log("Game loaded.")
                     
                     if event.sym == tcod.event.KeySym.Q:
+                        world.llm.close(wait=False)
+                        autosave.close()
                         return
 
+            # --- Simulation (fixed timestep) ---
+            for _ in range(ticks):
+                world.update_simulation(timestep.tick_seconds)
+                world._handle_npc_speech()
+                autosave.update(timestep.tick_seconds)
+
+            # --- Drawing ---
+            draw(console, world, frame_stats)
+
+            # --- Background Work (chunk prefetch, LLM results) in what is left of the budget ---
+            remaining = FRAME_BUDGET - (time.perf_counter() - frame_start)
+            world.process_background_work(remaining)
+            work_time = time.perf_counter() - frame_start
+            frame_stats.record(frame_time, work_time, ticks, remaining <= 0)
+
+            # --- Presenting and Pacing ---
+            context.present(console)
+            sleep_time = frame_seconds - (time.perf_counter() - frame_start)
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,98 @@
+# net/client.py
+import asyncio
+import numpy as np
+from config import SERVER_HOST, SERVER_PORT, SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES
+from net.protocol import (
+    HELLO, WELCOME, MSG_HELLO, MSG_WELCOME, MSG_INPUT, MSG_UPDATE, UNSENT_TILE,
+    ProtocolError, encode_frame, read_frame, encode_commands, decode_update, shift_view,
+)
+from tile_types import TileRegion
+
+class GameClient:
+    """A connection to the game server and a mirror of the client's viewport.
+
+    Headless: the tcod front end (client.py) draws from it and the load test drives many
+    of them. Commands are collected with queue() and sent as one batch by flush().
+    """
+    def __init__(self, view_width=SCREEN_WIDTH_TILES, view_height=SCREEN_HEIGHT_TILES):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.reader = None
+        self.writer = None
+        self.client_id = None
+        self.seed = None
+        self.connected = False
+        # --- Mirrored state ---
+        self.origin = None
+        self.tiles = np.full((view_height, view_width), UNSENT_TILE, dtype=np.uint8)
+        self.entities = {} # id -> (x, y, kind); other players use AVATAR_ID_BASE ids and AVATAR_KIND
+        self.chat_log = []
+        self.player = (0, 0, 0) # x, y, hp
+        self.tick = 0
+        self.pending = [] # Commands waiting for flush()
+        self.updates = 0
+
+    async def connect(self, host=SERVER_HOST, port=SERVER_PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(encode_frame(MSG_HELLO, HELLO.pack(self.view_width, self.view_height)))
+        msg_type, payload = await read_frame(self.reader)
+        if msg_type != MSG_WELCOME:
+            raise ProtocolError(f"Expected welcome, got message type {msg_type}")
+        self.client_id, self.seed, self.view_width, self.view_height = WELCOME.unpack(payload)
+        self.tiles = np.full((self.view_height, self.view_width), UNSENT_TILE, dtype=np.uint8)
+        self.connected = True
+
+    async def receive(self):
+        """Applies updates from the server until it closes the connection."""
+        try:
+            while True:
+                msg_type, payload = await read_frame(self.reader)
+                if msg_type == MSG_UPDATE:
+                    self.apply(decode_update(payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connected = False
+
+    def apply(self, update):
+        """Brings the mirror up to date with one update, scrolling it exactly as the server did."""
+        if self.origin is not None:
+            self.tiles = shift_view(self.tiles, self.origin, update.origin)
+        self.origin = update.origin
+        if update.keyframe:
+            self.tiles = update.tile_ids.reshape(self.view_height, self.view_width).copy()
+        else:
+            self.tiles.flat[update.tile_indices] = update.tile_ids
+        for entity_id, x, y, kind in zip(update.entity_ids.tolist(), update.entity_xs.tolist(),
+                                         update.entity_ys.tolist(), update.entity_kinds.tolist()):
+            self.entities[entity_id] = (x, y, kind)
+        for entity_id in update.removed_ids.tolist():
+            self.entities.pop(entity_id, None)
+        self.chat_log = (self.chat_log + update.chat)[-100:]
+        self.player = update.player
+        self.tick = update.tick
+        self.updates += 1
+
+    def region(self):
+        """The mirrored viewport as a TileRegion; tiles not received yet are unknown."""
+        known = self.tiles != UNSENT_TILE
+        x, y = self.origin or (0, 0)
+        return TileRegion(x, y, np.where(known, self.tiles, 0), known)
+
+    def queue(self, command, arg1=0, arg2=0):
+        self.pending.append((command, arg1, arg2))
+
+    def flush(self):
+        """Sends the queued commands as one batch."""
+        if self.pending and self.connected:
+            self.writer.write(encode_frame(MSG_INPUT, encode_commands(self.pending)))
+        self.pending.clear()
+
+    async def close(self):
+        if self.writer is None:
+            return
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
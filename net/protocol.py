@@ -0,0 +1,180 @@
+# net/protocol.py
+import asyncio
+import struct
+import zlib
+import numpy as np
+from data.items import ITEM_DEFINITIONS
+from tile_types import TILES
+
+# Messages between the game server and its clients.
+#
+# Every message is a frame: a uint32 payload length, a uint8 message type, then the
+# payload. Integers are little-endian. Payloads above COMPRESS_THRESHOLD bytes are
+# zlib-compressed and their type carries the MSG_COMPRESSED bit.
+#
+# An update holds one tick's changes to a client's viewport: the header, then the
+# changed tiles (uint16 viewport indices, then uint8 tile IDs; on a keyframe only the
+# IDs of every tile), then moved or new entities (uint32 ids, uint16 xs, uint16 ys,
+# uint8 kinds), then removed entity ids (uint32), then chat lines (uint16 length + UTF-8).
+FRAME = struct.Struct("<IB") # payload length, message type
+HELLO = struct.Struct("<HH") # view width, view height
+WELCOME = struct.Struct("<IQHH") # client id, world seed, view width, view height
+COMMAND = struct.Struct("<Bbb") # command, two arguments
+UPDATE = struct.Struct("<IHHHHHBHHHB") # tick, origin x, origin y, player x, player y, player hp,
+                                       # flags, tile count, entity count, removal count, chat count
+CHAT_LINE = struct.Struct("<H")
+
+# --- Message Types ---
+MSG_HELLO = 1   # Client -> server, once after connecting
+MSG_WELCOME = 2 # Server -> client, answers the hello
+MSG_INPUT = 3   # Client -> server, a batch of commands
+MSG_UPDATE = 4  # Server -> client, one per tick
+MSG_COMPRESSED = 0x80
+COMPRESS_THRESHOLD = 256
+MAX_FRAME = 1 << 20 # Larger frames are a protocol error
+
+# --- Commands (arguments in parentheses) ---
+CMD_MOVE = 1  # (dx, dy)
+CMD_TALK = 2
+CMD_CRAFT = 3 # (item index)
+CMD_USE = 4   # (item index)
+ITEM_KEYS = list(ITEM_DEFINITIONS.keys()) # Item index -> item key for CMD_CRAFT and CMD_USE
+
+# --- Update Flags ---
+FLAG_KEYFRAME = 1 # The update carries every tile of the viewport
+
+# Viewport cells the client has not been sent. Never a real tile ID.
+UNSENT_TILE = 255
+assert len(TILES) < UNSENT_TILE
+
+# Other players appear among the entities with ids from here on, as entities.store.AVATAR_KIND
+AVATAR_ID_BASE = 1 << 31
+
+class ProtocolError(Exception):
+    pass
+
+class ViewUpdate:
+    """One tick's changes to a client's viewport; see the layout notes above."""
+    def __init__(self, tick, origin, player, keyframe=False, tile_indices=None, tile_ids=None,
+                 entity_ids=None, entity_xs=None, entity_ys=None, entity_kinds=None,
+                 removed_ids=None, chat=None):
+        self.tick = tick
+        self.origin = origin # (x, y) of the viewport's top left tile
+        self.player = player # (x, y, hp) of the client's own avatar
+        self.keyframe = keyframe
+        self.tile_indices = _array(tile_indices, np.uint16)
+        self.tile_ids = _array(tile_ids, np.uint8)
+        self.entity_ids = _array(entity_ids, np.uint32)
+        self.entity_xs = _array(entity_xs, np.uint16)
+        self.entity_ys = _array(entity_ys, np.uint16)
+        self.entity_kinds = _array(entity_kinds, np.uint8)
+        self.removed_ids = _array(removed_ids, np.uint32)
+        self.chat = chat or []
+
+    def is_empty(self):
+        return not (len(self.tile_ids) or len(self.entity_ids) or len(self.removed_ids) or self.chat)
+
+def _array(values, dtype):
+    return np.zeros(0, dtype=dtype) if values is None else np.asarray(values, dtype=dtype)
+
+# --- Framing ---
+def encode_frame(msg_type, payload=b""):
+    if len(payload) > COMPRESS_THRESHOLD:
+        payload = zlib.compress(payload, 1)
+        msg_type |= MSG_COMPRESSED
+    return FRAME.pack(len(payload), msg_type) + payload
+
+async def read_frame(reader: asyncio.StreamReader):
+    """Reads one frame and returns (message type, payload). Raises IncompleteReadError at end of stream."""
+    length, msg_type = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if length > MAX_FRAME:
+        raise ProtocolError(f"Frame of {length} bytes is too large")
+    payload = await reader.readexactly(length)
+    if msg_type & MSG_COMPRESSED:
+        payload = zlib.decompress(payload)
+        msg_type &= ~MSG_COMPRESSED
+    return msg_type, payload
+
+# --- Commands ---
+def encode_commands(commands):
+    """commands is a list of (command, arg1, arg2) tuples."""
+    return b"".join(COMMAND.pack(*command) for command in commands)
+
+def decode_commands(payload):
+    if len(payload) % COMMAND.size:
+        raise ProtocolError("Truncated command batch")
+    return list(COMMAND.iter_unpack(payload))
+
+# --- Updates ---
+def encode_update(update: ViewUpdate):
+    header = UPDATE.pack(
+        update.tick, *update.origin, *update.player,
+        FLAG_KEYFRAME if update.keyframe else 0,
+        len(update.tile_ids), len(update.entity_ids), len(update.removed_ids), len(update.chat),
+    )
+    parts = [header]
+    if not update.keyframe:
+        parts.append(update.tile_indices.astype("<u2").tobytes())
+    parts += [
+        update.tile_ids.tobytes(),
+        update.entity_ids.astype("<u4").tobytes(),
+        update.entity_xs.astype("<u2").tobytes(),
+        update.entity_ys.astype("<u2").tobytes(),
+        update.entity_kinds.tobytes(),
+        update.removed_ids.astype("<u4").tobytes(),
+    ]
+    for line in update.chat:
+        text = line.encode("utf-8")[:0xFFFF]
+        parts += [CHAT_LINE.pack(len(text)), text]
+    return b"".join(parts)
+
+def decode_update(payload):
+    try:
+        (tick, origin_x, origin_y, player_x, player_y, player_hp, flags,
+         tile_count, entity_count, removed_count, chat_count) = UPDATE.unpack_from(payload)
+        offset = UPDATE.size
+
+        def take(dtype, count):
+            nonlocal offset
+            values = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+            offset += values.nbytes
+            return values
+
+        keyframe = bool(flags & FLAG_KEYFRAME)
+        tile_indices = None if keyframe else take("<u2", tile_count)
+        tile_ids = take(np.uint8, tile_count)
+        entity_ids = take("<u4", entity_count)
+        entity_xs = take("<u2", entity_count)
+        entity_ys = take("<u2", entity_count)
+        entity_kinds = take(np.uint8, entity_count)
+        removed_ids = take("<u4", removed_count)
+        chat = []
+        for _ in range(chat_count):
+            (length,) = CHAT_LINE.unpack_from(payload, offset)
+            offset += CHAT_LINE.size
+            chat.append(payload[offset:offset + length].decode("utf-8", errors="replace"))
+            offset += length
+    except (struct.error, ValueError) as e:
+        raise ProtocolError(f"Malformed update: {e}") from e
+    return ViewUpdate(tick, (origin_x, origin_y), (player_x, player_y, player_hp), keyframe,
+                      tile_indices, tile_ids, entity_ids, entity_xs, entity_ys, entity_kinds,
+                      removed_ids, chat)
+
+# --- Viewport Bookkeeping (identical on both ends, so deltas line up) ---
+def viewport_origin(player_x, player_y, view_width, view_height, world_width, world_height):
+    """Top left tile of a viewport centered on the player and kept inside the world, as in the renderer."""
+    x = max(0, min(player_x - view_width // 2, world_width - view_width))
+    y = max(0, min(player_y - view_height // 2, world_height - view_height))
+    return x, y
+
+def shift_view(tiles, old_origin, new_origin):
+    """Moves a viewport's tile IDs to a new origin; cells scrolled in become UNSENT_TILE."""
+    if old_origin == new_origin:
+        return tiles
+    height, width = tiles.shape
+    shifted = np.full_like(tiles, UNSENT_TILE)
+    dx, dy = new_origin[0] - old_origin[0], new_origin[1] - old_origin[1]
+    if abs(dx) < width and abs(dy) < height:
+        shifted[max(0, -dy):height - max(0, dy), max(0, -dx):width - max(0, dx)] = \
+            tiles[max(0, dy):height - max(0, -dy), max(0, dx):width - max(0, -dx)]
+    return shifted
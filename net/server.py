@@ -0,0 +1,275 @@
+# net/server.py
+import asyncio
+import struct
+import time
+from collections import deque
+import numpy as np
+from config import (
+    WORLD_WIDTH, WORLD_HEIGHT, SIM_TICK_RATE, MAX_TICKS_PER_FRAME, FRAME_STATS_WINDOW,
+    SERVER_HOST, SERVER_PORT, SERVER_TICK_BUDGET, SERVER_MAX_INPUTS_PER_TICK,
+    SERVER_MAX_QUEUED_INPUTS, SERVER_SEND_BUFFER_LIMIT, SERVER_KEYFRAME_RATIO,
+)
+from engine import Player
+from entities.store import AVATAR_KIND
+from net.protocol import (
+    HELLO, WELCOME, MSG_HELLO, MSG_WELCOME, MSG_INPUT, MSG_UPDATE,
+    CMD_MOVE, CMD_TALK, CMD_CRAFT, CMD_USE, ITEM_KEYS, UNSENT_TILE, AVATAR_ID_BASE,
+    ProtocolError, ViewUpdate, encode_frame, read_frame, decode_commands, encode_update,
+    viewport_origin, shift_view,
+)
+from simulation.loop import FrameStats
+
+DEPARTED_HISTORY = 1024 # Traffic totals kept for clients that have left
+
+class ClientSession:
+    """One connected client: its avatar, its queued commands and what it has been sent so far."""
+    def __init__(self, client_id, writer, player, view_width, view_height, chat_serial):
+        self.client_id = client_id
+        self.writer = writer
+        self.player = player
+        self.view_width = view_width
+        self.view_height = view_height
+        self.inputs = deque(maxlen=SERVER_MAX_QUEUED_INPUTS) # (command, arg1, arg2), oldest dropped when full
+        # The client's copy of its view, as of the last update sent
+        self.origin = None
+        self.tiles = np.full((view_height, view_width), UNSENT_TILE, dtype=np.uint8)
+        self.entity_ids = np.zeros(0, dtype=np.uint32)
+        self.entity_xs = np.zeros(0, dtype=np.int32)
+        self.entity_ys = np.zeros(0, dtype=np.int32)
+        self.entity_kinds = np.zeros(0, dtype=np.uint8)
+        self.chat_serial = chat_serial
+        self.last_player = None
+        # Traffic
+        self.connected_at = time.perf_counter()
+        self.bytes_sent = 0
+        self.updates_sent = 0
+        self.skipped_updates = 0 # Ticks skipped because the client was not reading fast enough
+        self.commands = 0
+
+    def traffic(self, now=None):
+        seconds = max((now or time.perf_counter()) - self.connected_at, 1e-9)
+        return {"client_id": self.client_id, "seconds": seconds, "bytes": self.bytes_sent,
+                "bytes_per_second": self.bytes_sent / seconds, "updates": self.updates_sent,
+                "skipped_updates": self.skipped_updates, "commands": self.commands}
+
+class GameServer:
+    """Runs the world at a fixed tick rate and streams each client its viewport as per-tick deltas.
+
+    Clients send batches of commands whenever they like; each tick applies a few queued
+    commands per client, advances the simulation, then sends every client only what changed
+    in its view: tiles, entities that moved, appeared or left, and new chat lines.
+
+    The world still simulates around a single player: world.player is the avatar of the
+    longest-connected client, so LOD, chunk prefetch and greeting prefetch follow that
+    client. The other clients' commands run with their avatar swapped in as world.player.
+    """
+    def __init__(self, world, host=SERVER_HOST, port=SERVER_PORT, tick_rate=SIM_TICK_RATE,
+                 autosave=None, stats_window=FRAME_STATS_WINDOW):
+        self.world = world
+        self.host = host
+        self.port = port # 0 picks a free port, see start()
+        self.tick_seconds = 1.0 / tick_rate
+        self.autosave = autosave
+        self.sessions = [] # Oldest first; the first one is the simulation focus
+        self.departed = deque(maxlen=DEPARTED_HISTORY)
+        self.next_client_id = 1
+        self.host_player = world.player # Given to the first client, so saves keep the usual player
+        self.spawn = (world.player.x, world.player.y) # Where every later client's avatar appears
+        self.ticks = 0
+        self.dropped_ticks = 0
+        self.tick_stats = FrameStats(window=stats_window)
+        self.server = None
+        self.running = False
+
+    async def start(self):
+        """Starts accepting clients and returns the port in use."""
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def run(self, duration=None):
+        """Ticks until stop() is called or duration seconds have passed."""
+        loop = asyncio.get_running_loop()
+        self.running = True
+        last_tick = next_tick = loop.time()
+        end = None if duration is None else next_tick + duration
+        while self.running and (end is None or next_tick < end):
+            now = loop.time()
+            work_start = time.perf_counter()
+            over_budget = self.tick()
+            self.tick_stats.record(now - last_tick, time.perf_counter() - work_start, 1, over_budget)
+            last_tick = now
+
+            next_tick += self.tick_seconds
+            behind = loop.time() - next_tick
+            if behind > MAX_TICKS_PER_FRAME * self.tick_seconds:
+                # Past this the simulation slows down instead of spiralling, as in the local loop
+                self.dropped_ticks += int(behind / self.tick_seconds)
+                next_tick = loop.time()
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    def stop(self):
+        self.running = False
+
+    async def close(self):
+        self.running = False
+        if self.server is None:
+            return
+        self.server.close()
+        for session in self.sessions:
+            session.writer.close()
+        await self.server.wait_closed()
+
+    # --- Ticking ---
+    def tick(self):
+        """Runs one tick: queued commands, simulation, background work, then client updates.
+
+        Returns True if the tick used up its budget before the background work.
+        """
+        start = time.perf_counter()
+        world = self.world
+        for session in self.sessions:
+            self._apply_inputs(session)
+        world.update_simulation(self.tick_seconds)
+        world._handle_npc_speech()
+        if self.autosave:
+            self.autosave.update(self.tick_seconds)
+        remaining = SERVER_TICK_BUDGET - (time.perf_counter() - start)
+        world.process_background_work(remaining)
+        self.ticks += 1
+        for session in self.sessions:
+            self._send_update(session)
+        return remaining <= 0
+
+    def _apply_inputs(self, session):
+        if not session.inputs:
+            return
+        world = self.world
+        focus = world.player
+        world.player = session.player
+        try:
+            for _ in range(min(len(session.inputs), SERVER_MAX_INPUTS_PER_TICK)):
+                command, arg1, arg2 = session.inputs.popleft()
+                session.commands += 1
+                if command == CMD_MOVE:
+                    world.handle_player_movement(max(-1, min(1, arg1)), max(-1, min(1, arg2)))
+                elif command == CMD_TALK:
+                    world.talk_to_npc()
+                elif command == CMD_CRAFT and 0 <= arg1 < len(ITEM_KEYS):
+                    world.craft_item(ITEM_KEYS[arg1])
+                elif command == CMD_USE and 0 <= arg1 < len(ITEM_KEYS):
+                    world.use_item(ITEM_KEYS[arg1])
+        finally:
+            world.player = focus
+
+    def _send_update(self, session):
+        writer = session.writer
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > SERVER_SEND_BUFFER_LIMIT:
+            # Nothing is lost: the next update is diffed against what the client actually has
+            session.skipped_updates += 1
+            return
+        update = self.build_update(session)
+        if update is None:
+            return
+        frame = encode_frame(MSG_UPDATE, encode_update(update))
+        writer.write(frame)
+        session.bytes_sent += len(frame)
+        session.updates_sent += 1
+
+    def build_update(self, session):
+        """Diffs a client's view against the world and records it as sent. None if nothing changed."""
+        world = self.world
+        player = session.player
+        width, height = session.view_width, session.view_height
+        origin = viewport_origin(player.x, player.y, width, height, WORLD_WIDTH, WORLD_HEIGHT)
+        x, y = origin
+
+        # --- Tiles, compared with the client's copy scrolled to the new origin ---
+        tiles = world.get_tile_region(x, y, width, height).tile_ids
+        sent = session.tiles if session.origin is None else shift_view(session.tiles, session.origin, origin)
+        changed = np.flatnonzero(tiles != sent)
+        keyframe = len(changed) > SERVER_KEYFRAME_RATIO * tiles.size
+        tile_indices = None if keyframe else changed
+        tile_ids = tiles.ravel() if keyframe else tiles.ravel()[changed]
+        session.origin = origin
+        session.tiles = tiles
+
+        # --- Entities in view, plus the other clients' avatars ---
+        store = world.entities
+        indices = store.query_rect(x, y, width, height)
+        ids, xs, ys, kinds = indices.astype(np.uint32), store.x[indices], store.y[indices], store.kind[indices]
+        others = [other for other in self.sessions if other is not session
+                  and x <= other.player.x < x + width and y <= other.player.y < y + height]
+        if others:
+            ids = np.concatenate([ids, np.array([AVATAR_ID_BASE + other.client_id for other in others], dtype=np.uint32)])
+            xs = np.concatenate([xs, np.array([other.player.x for other in others], dtype=np.int32)])
+            ys = np.concatenate([ys, np.array([other.player.y for other in others], dtype=np.int32)])
+            kinds = np.concatenate([kinds, np.full(len(others), AVATAR_KIND, dtype=np.uint8)])
+        _, new_rows, old_rows = np.intersect1d(ids, session.entity_ids, assume_unique=True, return_indices=True)
+        moved = np.ones(len(ids), dtype=bool)
+        moved[new_rows] = (xs[new_rows] != session.entity_xs[old_rows]) | \
+            (ys[new_rows] != session.entity_ys[old_rows]) | (kinds[new_rows] != session.entity_kinds[old_rows])
+        removed = np.setdiff1d(session.entity_ids, ids, assume_unique=True)
+        session.entity_ids, session.entity_xs, session.entity_ys, session.entity_kinds = ids, xs, ys, kinds
+
+        # --- Chat lines added since the last update ---
+        new_lines = world.chat_serial - session.chat_serial
+        chat = world.chat_log[-new_lines:][-255:] if new_lines > 0 else []
+        session.chat_serial = world.chat_serial
+
+        player_state = (player.x, player.y, max(0, min(player.hp, 0xFFFF)))
+        update = ViewUpdate(self.ticks, origin, player_state, keyframe, tile_indices, tile_ids,
+                            ids[moved], xs[moved], ys[moved], kinds[moved], removed, chat)
+        if update.is_empty() and player_state == session.last_player:
+            return None
+        session.last_player = player_state
+        return update
+
+    # --- Connections ---
+    async def _handle_client(self, reader, writer):
+        session = None
+        try:
+            msg_type, payload = await read_frame(reader)
+            if msg_type != MSG_HELLO:
+                raise ProtocolError(f"Expected hello, got message type {msg_type}")
+            view_width, view_height = HELLO.unpack(payload)
+            session = self._join(writer, max(1, min(view_width, WORLD_WIDTH)), max(1, min(view_height, WORLD_HEIGHT)))
+            writer.write(encode_frame(MSG_WELCOME, WELCOME.pack(
+                session.client_id, self.world.seed, session.view_width, session.view_height)))
+            while True:
+                msg_type, payload = await read_frame(reader)
+                if msg_type != MSG_INPUT:
+                    raise ProtocolError(f"Unexpected message type {msg_type}")
+                session.inputs.extend(decode_commands(payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass # Client went away
+        except (ProtocolError, struct.error) as e:
+            print(f"Dropping client {writer.get_extra_info('peername')}: {e}")
+        finally:
+            if session is not None:
+                self._leave(session)
+            writer.close()
+
+    def _join(self, writer, view_width, view_height):
+        player = self.host_player if not self.sessions else Player(*self.spawn)
+        chat_serial = self.world.chat_serial - len(self.world.chat_log) # New clients get the recent chat too
+        session = ClientSession(self.next_client_id, writer, player, view_width, view_height, chat_serial)
+        self.next_client_id += 1
+        self.sessions.append(session)
+        self.world.player = self.sessions[0].player
+        self.world.add_message_to_chat_log(f"Player {session.client_id} joined.")
+        return session
+
+    def _leave(self, session):
+        self.sessions.remove(session)
+        self.departed.append(session.traffic())
+        self.world.player = self.sessions[0].player if self.sessions else self.host_player
+        self.world.add_message_to_chat_log(f"Player {session.client_id} left.")
+
+    def stats(self):
+        """Tick timing plus traffic totals for connected and departed clients."""
+        now = time.perf_counter()
+        return dict(self.tick_stats.summary(), ticks=self.ticks, dropped_ticks=self.dropped_ticks,
+                    clients=[session.traffic(now) for session in self.sessions] + list(self.departed))
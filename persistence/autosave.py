@@ -0,0 +1,171 @@
+# persistence/autosave.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from persistence.save import (
+    encode_save, write_atomic, npc_record, village_record, player_record, snapshot_state,
+)
+from simulation.lod import FULL_TIER
+from config import AUTOSAVE_INTERVAL
+
+class Snapshot:
+    """Copies of everything that changed since the previous autosave."""
+    def __init__(self):
+        self.deltas = {}          # (chunk_x, chunk_y) -> ChunkDelta copy
+        self.inventory = {}       # Changed inventory entries
+        self.removed_items = []   # Inventory keys that are gone
+        self.npcs = {}            # Index in world.npcs -> record
+        self.npc_count = 0
+        self.villages = {}        # (chunk_x, chunk_y) -> record
+        self.llm_results = {}     # New cached LLM results
+        self.memories = {}        # npc_id -> record of changed conversation memories
+        self.scalars = {}         # Clock and player stats, always copied
+
+class AutosaveService:
+    """Saves the world periodically on a background thread.
+
+    The main thread only copies what changed since the last save. The writer thread
+    merges that into its own mirror of the save and writes the whole file atomically.
+    """
+    def __init__(self, world, path, interval=AUTOSAVE_INTERVAL):
+        self.world = world
+        self.path = path
+        self.interval = interval
+        self.elapsed = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self._pending = None
+
+        # The writer's mirror starts as a full copy of the current world
+        self._deltas = {key: delta.copy() for key, delta in world.deltas.items()}
+        world.dirty_chunks.clear()
+        self._state = snapshot_state(world)
+        self._villages = {tuple(record["chunk"]): record for record in self._state.pop("villages")}
+        # Main-thread view of what was last handed to the writer, for change detection
+        self._seen_inventory = dict(world.player.inventory)
+        self._seen_npcs = list(self._state["npcs"])
+        self._seen_village_versions = {key: self._village_version(village) for key, village in world.simulation.villages.items()}
+        self._seen_llm_keys = set(world.llm_results)
+        self._seen_memory_versions = {key: memory.version for key, memory in world.memories.items()}
+
+        self.stats = {
+            "saves": 0,
+            "skipped": 0,
+            "last_pause_ms": 0.0,
+            "max_pause_ms": 0.0,
+            "last_bytes": 0,
+            "total_bytes": 0,
+            "last_write_ms": 0.0,
+        }
+
+    def _village_version(self, village):
+        return (village.last_update_minutes, village.next_resident_id, village.population)
+
+    def update(self, dt):
+        """Call once per frame; starts a save when the interval has passed."""
+        self._collect_finished()
+        self.elapsed += dt
+        if self.elapsed >= self.interval:
+            self.elapsed = 0.0
+            self.save_now()
+
+    def save_now(self):
+        """Snapshots changes on the calling thread and hands them to the writer thread."""
+        if self._pending and not self._pending.done():
+            self.stats["skipped"] += 1 # Previous save is still writing, changes carry over
+            return
+        start = time.perf_counter()
+        snapshot = self._snapshot()
+        pause_ms = (time.perf_counter() - start) * 1000
+        self.stats["last_pause_ms"] = pause_ms
+        self.stats["max_pause_ms"] = max(self.stats["max_pause_ms"], pause_ms)
+        self._pending = self._executor.submit(self._write, snapshot)
+
+    def _snapshot(self):
+        world = self.world
+        snapshot = Snapshot()
+
+        for key in world.dirty_chunks:
+            snapshot.deltas[key] = world.deltas[key].copy()
+        world.dirty_chunks.clear()
+
+        inventory = world.player.inventory
+        for item, quantity in inventory.items():
+            if self._seen_inventory.get(item) != quantity:
+                snapshot.inventory[item] = quantity
+        snapshot.removed_items = [item for item in self._seen_inventory if item not in inventory]
+        self._seen_inventory = dict(inventory)
+
+        snapshot.npc_count = len(world.npcs)
+        seen_npcs = self._seen_npcs[:snapshot.npc_count]
+        for i, npc in enumerate(world.npcs):
+            record = npc_record(npc)
+            if i >= len(seen_npcs):
+                seen_npcs.append(record)
+            elif seen_npcs[i] == record:
+                continue
+            seen_npcs[i] = record
+            snapshot.npcs[i] = record
+        self._seen_npcs = seen_npcs
+
+        for key, village in world.simulation.villages.items():
+            version = self._village_version(village)
+            if village.tier == FULL_TIER or self._seen_village_versions.get(key) != version:
+                snapshot.villages[key] = village_record(village)
+                self._seen_village_versions[key] = version
+
+        for key in world.llm_results.keys() - self._seen_llm_keys:
+            snapshot.llm_results[key] = world.llm_results[key]
+        self._seen_llm_keys.update(snapshot.llm_results)
+
+        for key, memory in world.memories.items():
+            if self._seen_memory_versions.get(key) != memory.version:
+                snapshot.memories[key] = memory.record()
+                self._seen_memory_versions[key] = memory.version
+
+        snapshot.scalars = {"world_minutes": world.world_minutes, "player": player_record(world.player)}
+        return snapshot
+
+    def _write(self, snapshot):
+        """Runs on the writer thread: merge the snapshot into the mirror and write the file."""
+        start = time.perf_counter()
+        self._deltas.update(snapshot.deltas)
+
+        state = self._state
+        state["world_minutes"] = snapshot.scalars["world_minutes"]
+        inventory = state["player"]["inventory"]
+        state["player"] = dict(snapshot.scalars["player"], inventory=inventory)
+        inventory.update(snapshot.inventory)
+        for item in snapshot.removed_items:
+            inventory.pop(item, None)
+        del state["npcs"][snapshot.npc_count:]
+        for i, record in sorted(snapshot.npcs.items()):
+            if i < len(state["npcs"]):
+                state["npcs"][i] = record
+            else:
+                state["npcs"].append(record)
+        self._villages.update(snapshot.villages)
+        state["llm_results"].update(snapshot.llm_results)
+        state["memories"].update(snapshot.memories)
+
+        data = encode_save(self.world.seed, self._deltas, dict(state, villages=list(self._villages.values())))
+        write_atomic(self.path, data)
+        return len(data), (time.perf_counter() - start) * 1000
+
+    def _collect_finished(self):
+        if self._pending and self._pending.done():
+            pending, self._pending = self._pending, None
+            try:
+                written, write_ms = pending.result()
+            except OSError as e:
+                print(f"Autosave failed: {e}")
+                return
+            self.stats["saves"] += 1
+            self.stats["last_bytes"] = written
+            self.stats["total_bytes"] += written
+            self.stats["last_write_ms"] = write_ms
+            print(f"Autosaved {written} bytes (main thread paused {self.stats['last_pause_ms']:.2f} ms, "
+                  f"background write {write_ms:.1f} ms)")
+
+    def close(self):
+        """Waits for any save in progress to finish."""
+        self._executor.shutdown(wait=True)
+        self._collect_finished()
@@ -0,0 +1,88 @@
+# persistence/chunk_storage.py
+import os
+import struct
+import zlib
+import numpy as np
+from config import CHUNK_SIZE
+
+# Pregenerated detail-stage output (tile IDs and trees) for non-village chunks.
+# Villages are not stored: their layout is rebuilt from the seed in microseconds
+# and they need live Building objects anyway.
+#
+# Layout: header, then an index with one (offset, length) slot per chunk (row-major,
+# length 0 = not stored), then one zlib-compressed record per stored chunk:
+# CHUNK_SIZE * CHUNK_SIZE tile IDs, a uint16 tree count, tree kind IDs and tree
+# local indices (y * CHUNK_SIZE + x).
+MAGIC = b"TILC"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHQHHH") # magic, version, seed, chunk_width, chunk_height, chunk_size
+INDEX_ENTRY = struct.Struct("<QI")
+
+class ChunkStorageWriter:
+    """Writes pregenerated chunks to a temporary file, renamed into place on close()."""
+    def __init__(self, path, seed, chunk_width, chunk_height):
+        self.path = path
+        self.seed = seed
+        self.chunk_width = chunk_width
+        self.chunk_height = chunk_height
+        self.index = np.zeros((chunk_width * chunk_height, 2), dtype=np.uint64)
+        self.file = open(path + ".tmp", "wb")
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, seed, chunk_width, chunk_height, CHUNK_SIZE))
+        self.file.write(b"\0" * (INDEX_ENTRY.size * len(self.index)))
+        self.bytes_written = self.file.tell()
+
+    def write_chunk(self, chunk_x, chunk_y, tiles, tree_kinds, tree_xs, tree_ys):
+        """Stores one chunk. Tree positions are in world coordinates."""
+        local = (np.asarray(tree_ys) - chunk_y * CHUNK_SIZE) * CHUNK_SIZE + (np.asarray(tree_xs) - chunk_x * CHUNK_SIZE)
+        record = b"".join([
+            np.ascontiguousarray(tiles, dtype=np.uint8).tobytes(),
+            struct.pack("<H", len(tree_kinds)),
+            np.asarray(tree_kinds, dtype=np.uint8).tobytes(),
+            local.astype("<u2").tobytes(),
+        ])
+        data = zlib.compress(record, 6)
+        self.index[chunk_y * self.chunk_width + chunk_x] = (self.file.tell(), len(data))
+        self.file.write(data)
+        self.bytes_written += len(data)
+
+    def close(self):
+        self.file.seek(HEADER.size)
+        self.file.write(b"".join(INDEX_ENTRY.pack(int(offset), int(length)) for offset, length in self.index))
+        self.file.close()
+        os.replace(self.path + ".tmp", self.path)
+
+class ChunkStorage:
+    """Reads pregenerated chunks on demand; only the index is loaded up front."""
+    def __init__(self, path, seed=None):
+        self.file = open(path, "rb")
+        magic, version, file_seed, self.chunk_width, self.chunk_height, chunk_size = \
+            HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION or chunk_size != CHUNK_SIZE:
+            raise ValueError(f"Not a supported chunk storage file: {path}")
+        if seed is not None and seed != file_seed:
+            raise ValueError(f"Chunk storage {path} was generated for seed {file_seed}, not {seed}")
+        self.seed = file_seed
+        index_bytes = self.file.read(INDEX_ENTRY.size * self.chunk_width * self.chunk_height)
+        self.index = np.frombuffer(index_bytes, dtype=np.dtype([("offset", "<u8"), ("length", "<u4")]))
+
+    def read_chunk(self, chunk_x, chunk_y):
+        """Returns (tiles, (kind_ids, xs, ys)) for a stored chunk, or None if it was not pregenerated."""
+        if not (0 <= chunk_x < self.chunk_width and 0 <= chunk_y < self.chunk_height):
+            return None
+        entry = self.index[chunk_y * self.chunk_width + chunk_x]
+        if entry["length"] == 0:
+            return None
+        self.file.seek(int(entry["offset"]))
+        record = zlib.decompress(self.file.read(int(entry["length"])))
+
+        cells = CHUNK_SIZE * CHUNK_SIZE
+        tiles = np.frombuffer(record, dtype=np.uint8, count=cells).reshape(CHUNK_SIZE, CHUNK_SIZE).copy()
+        (tree_count,) = struct.unpack_from("<H", record, cells)
+        kinds = np.frombuffer(record, dtype=np.uint8, count=tree_count, offset=cells + 2).copy()
+        local = np.frombuffer(record, dtype="<u2", count=tree_count, offset=cells + 2 + tree_count).astype(np.int32)
+        xs = chunk_x * CHUNK_SIZE + local % CHUNK_SIZE
+        ys = chunk_y * CHUNK_SIZE + local // CHUNK_SIZE
+        return tiles, (kinds, xs, ys)
+
+    def close(self):
+        self.file.close()
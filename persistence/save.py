@@ -0,0 +1,173 @@
+# persistence/save.py
+import json
+import os
+import struct
+import zlib
+import numpy as np
+from engine import World, ChunkDelta
+from entities.base import NPC
+from llm.memory import ConversationMemory
+
+# Terrain is never written: it is regenerated from the seed. A save holds only the
+# seed, per-chunk deltas, entity/player state and cached LLM results.
+#
+# Layout: header (magic, version, seed), then a zlib-compressed body of sections.
+# Each section is a 4-byte tag, a uint32 length and the payload.
+MAGIC = b"TIL\x00"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHQ")
+SECTION = struct.Struct("<4sI")
+CHUNK_RECORD = struct.Struct("<HHHHI") # chunk_x, chunk_y, tile count, tree count, decorated bitmask
+
+def _encode_deltas(deltas):
+    parts = []
+    count = 0
+    for (chunk_x, chunk_y), delta in deltas.items():
+        if not (delta.tiles or delta.trees or delta.decorated_buildings):
+            continue
+        decorated = 0
+        for building_index in delta.decorated_buildings:
+            decorated |= 1 << building_index
+        parts.append(CHUNK_RECORD.pack(chunk_x, chunk_y, len(delta.tiles), len(delta.trees), decorated))
+        parts.append(np.fromiter(delta.tiles.keys(), dtype="<u2", count=len(delta.tiles)).tobytes())
+        parts.append(np.fromiter(delta.tiles.values(), dtype="u1", count=len(delta.tiles)).tobytes())
+        parts.append(np.fromiter(delta.trees.keys(), dtype="<u2", count=len(delta.trees)).tobytes())
+        parts.append(np.fromiter(delta.trees.values(), dtype="<i2", count=len(delta.trees)).tobytes())
+        count += 1
+    return struct.pack("<I", count) + b"".join(parts)
+
+def _decode_deltas(payload):
+    deltas = {}
+    (count,) = struct.unpack_from("<I", payload)
+    offset = 4
+    for _ in range(count):
+        chunk_x, chunk_y, tile_count, tree_count, decorated = CHUNK_RECORD.unpack_from(payload, offset)
+        offset += CHUNK_RECORD.size
+        tile_indices = np.frombuffer(payload, dtype="<u2", count=tile_count, offset=offset)
+        offset += 2 * tile_count
+        tile_ids = np.frombuffer(payload, dtype="u1", count=tile_count, offset=offset)
+        offset += tile_count
+        tree_indices = np.frombuffer(payload, dtype="<u2", count=tree_count, offset=offset)
+        offset += 2 * tree_count
+        tree_hp = np.frombuffer(payload, dtype="<i2", count=tree_count, offset=offset)
+        offset += 2 * tree_count
+
+        delta = ChunkDelta()
+        delta.tiles = dict(zip(tile_indices.tolist(), tile_ids.tolist()))
+        delta.trees = dict(zip(tree_indices.tolist(), tree_hp.tolist()))
+        delta.decorated_buildings = {i for i in range(32) if decorated & (1 << i)}
+        deltas[(chunk_x, chunk_y)] = delta
+    return deltas
+
+def npc_record(npc):
+    return {
+        "x": npc.x,
+        "y": npc.y,
+        "name": npc.name,
+        "dialogue": list(npc.dialogue),
+        "personality": npc.personality,
+        "family_ties": npc.family_ties,
+        "attitude_to_player": npc.attitude_to_player,
+        "kind": npc.kind_name,
+        "npc_id": npc.npc_id,
+    }
+
+def village_record(village):
+    village.sync_residents()
+    return {
+        "chunk": [village.chunk_x, village.chunk_y],
+        "residents": [dict(resident) for resident in village.residents],
+        "next_resident_id": village.next_resident_id,
+        "last_update_minutes": village.last_update_minutes,
+    }
+
+def player_record(player):
+    """Player state without the inventory, which autosave tracks entry by entry."""
+    return {"x": player.x, "y": player.y, "hp": player.hp, "max_hp": player.max_hp}
+
+def snapshot_state(world):
+    """Copies the small, structured state: player, clock, NPCs, village populations, NPC memories and LLM results."""
+    player = player_record(world.player)
+    player["inventory"] = dict(world.player.inventory)
+    return {
+        "world_minutes": world.world_minutes,
+        "player": player,
+        "npcs": [npc_record(npc) for npc in world.npcs],
+        "villages": [village_record(village) for village in world.simulation.villages.values()],
+        "llm_results": dict(world.llm_results),
+        "memories": {key: memory.record() for key, memory in world.memories.items()},
+    }
+
+def _apply_state(world, payload):
+    state = json.loads(payload.decode("utf-8"))
+    world.world_minutes = state["world_minutes"]
+    player = state["player"]
+    world.player.x, world.player.y = player["x"], player["y"]
+    world.player.hp, world.player.max_hp = player["hp"], player["max_hp"]
+    world.player.inventory = player["inventory"]
+    for npc_data in state["npcs"]:
+        world.npcs.append(NPC(world.entities, **npc_data))
+    for village_data in state["villages"]:
+        village = world.simulation.villages.get(tuple(village_data["chunk"]))
+        if village:
+            village.residents = village_data["residents"]
+            village.next_resident_id = village_data["next_resident_id"]
+            village.last_update_minutes = village_data["last_update_minutes"]
+    world.llm_results = state["llm_results"]
+    world.memories = {key: ConversationMemory(**record) for key, record in state.get("memories", {}).items()}
+    world.simulation.last_coarse_minutes = world.world_minutes
+
+def _section(tag, payload):
+    return SECTION.pack(tag, len(payload)) + payload
+
+def encode_save(seed, deltas, state):
+    """Returns the complete save file contents from a seed, chunk deltas and a state snapshot."""
+    state_payload = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    body = _section(b"CHNK", _encode_deltas(deltas)) + _section(b"STAT", state_payload)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, seed) + zlib.compress(body, 6)
+
+def encode_world(world):
+    return encode_save(world.seed, world.deltas, snapshot_state(world))
+
+def write_atomic(path, data):
+    """Writes via a temporary file and a rename, so a crash never leaves a half-written save."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def save_world(world, path):
+    """Saves the world and returns the number of bytes written."""
+    data = encode_world(world)
+    write_atomic(path, data)
+    return len(data)
+
+def load_world(path, chunk_storage=None):
+    """Rebuilds a world from its seed and queues the saved deltas.
+
+    No chunk is generated here; each chunk's delta is applied the first time it is touched.
+    chunk_storage optionally supplies pregenerated terrain for the same seed.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Not a supported save file: {path}")
+
+    sections = {}
+    body = zlib.decompress(data[HEADER.size:])
+    offset = 0
+    while offset < len(body):
+        tag, length = SECTION.unpack_from(body, offset)
+        offset += SECTION.size
+        sections[tag] = body[offset:offset + length]
+        offset += length
+
+    if chunk_storage is not None and chunk_storage.seed != seed:
+        chunk_storage = None # Pregenerated for another world
+    world = World(seed=seed, new_game=False, chunk_storage=chunk_storage)
+    world.deltas = _decode_deltas(sections[b"CHNK"])
+    _apply_state(world, sections[b"STAT"])
+    return world
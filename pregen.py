@@ -0,0 +1,147 @@
+# pregen.py
+"""Offline world pregeneration.
+
+Generates terrain for a region on several cores, writes it to a chunk storage file and
+pre-warms village lore and building interiors through the LLM queue, so a new game starts
+from finished content instead of generating it in the frame loop.
+
+Usage: python pregen.py --seed 1234 --out worlds/mine
+Play it with: python main.py worlds/mine.dat
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from cli import seed_arg
+from config import CHUNK_SIZE, LLM_WORKERS
+from engine import World
+from llm.queue import LLMRequestQueue
+from persistence.chunk_storage import ChunkStorageWriter
+from persistence.save import save_world
+from worldgen.detail import DetailGenerator
+from worldgen.terrain import TerrainGenerator
+from data.prompts import LLM_PROMPTS
+
+BATCH_SIZE = 16 # Chunks per worker task; larger batches amortize the per-call array setup
+INTERIOR_ROUNDS = 3 # Passes over undecorated buildings before giving up on them
+
+# --- Worker Process ---
+_terrain = None
+_detail = None
+
+def _init_worker(seed):
+    global _terrain, _detail
+    _terrain = TerrainGenerator(seed)
+    _detail = DetailGenerator(seed)
+
+def _generate_batch(chunk_coords):
+    """Runs the terrain and detail stages for a batch and splits the trees per chunk."""
+    tiles, (kinds, xs, ys) = _detail.generate(chunk_coords, _terrain.chunk_biomes(chunk_coords))
+    results = []
+    for (chunk_x, chunk_y), chunk_tiles in zip(chunk_coords, tiles):
+        in_chunk = (xs // CHUNK_SIZE == chunk_x) & (ys // CHUNK_SIZE == chunk_y)
+        results.append((chunk_x, chunk_y, chunk_tiles, kinds[in_chunk], xs[in_chunk], ys[in_chunk]))
+    return results
+
+# --- Stages ---
+def generate_terrain(world, chunks, path, workers):
+    """Generates every non-village chunk in parallel and writes them to chunk storage."""
+    coords = [(chunk.chunk_x, chunk.chunk_y) for chunk in chunks if chunk.poi_type != "village"]
+    tasks = [coords[i:i + BATCH_SIZE] for i in range(0, len(coords), BATCH_SIZE)]
+
+    writer = ChunkStorageWriter(path, world.seed, world.chunk_width, world.chunk_height)
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(world.seed,)) as pool:
+        futures = [pool.submit(_generate_batch, batch) for batch in tasks]
+        for future in futures:
+            for result in future.result():
+                writer.write_chunk(*result)
+                written += 1
+    writer.close()
+    return written, writer.bytes_written
+
+def prewarm_lore(world, chunks, llm):
+    """Requests lore for every village up front so village generation finds it cached."""
+    for chunk in chunks:
+        if chunk.poi_type != "village":
+            continue
+        lore_key = f"village_lore:{chunk.chunk_x}:{chunk.chunk_y}"
+        if lore_key not in world.llm_results:
+            llm.submit(LLM_PROMPTS["village_lore"], lambda response, key=lore_key: world.llm_results.__setitem__(key, response), kind="lore")
+            llm.poll()
+    llm.drain()
+
+def prewarm_interiors(world, villages):
+    """Furnishes every building of the generated villages; the results land in the save as deltas.
+
+    Only enough LLM layouts to fill each shape's pool are requested; the rest are variations.
+    Buildings whose request was rejected by a full queue, or whose layout failed to parse,
+    are retried for a few rounds. Returns (decorated, total) building counts.
+    """
+    buildings = [building for chunk in villages for building in chunk.village.buildings]
+    for _ in range(INTERIOR_ROUNDS):
+        waiting = [building for building in buildings if not building.interior_decorated]
+        if not waiting:
+            break
+        for building in waiting:
+            world.decorate_building_interior(building)
+            world.llm.poll()
+        world.llm.drain()
+    return sum(building.interior_decorated for building in buildings), len(buildings)
+
+def parse_region(text, world):
+    if text is None:
+        return 0, 0, world.chunk_width, world.chunk_height
+    x0, y0, x1, y1 = (int(value) for value in text.split(","))
+    return max(0, x0), max(0, y0), min(world.chunk_width, x1), min(world.chunk_height, y1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pregenerate a world offline.")
+    parser.add_argument("--seed", type=seed_arg, required=True)
+    parser.add_argument("--region", help="Chunk rectangle x0,y0,x1,y1 (end exclusive); defaults to the whole world")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Terrain worker processes")
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_WORKERS, help="Concurrent LLM requests")
+    parser.add_argument("--no-llm", action="store_true", help="Skip lore and interiors; villages are then built at play time")
+    parser.add_argument("--out", default="pregen", help="Output path without extension (.dat save, .chunks terrain)")
+    args = parser.parse_args()
+
+    total_start = time.perf_counter()
+    world = World(seed=args.seed, new_game=False)
+    x0, y0, x1, y1 = parse_region(args.region, world)
+    chunks = [world.chunks[cy][cx] for cy in range(y0, y1) for cx in range(x0, x1)]
+    villages = [chunk for chunk in chunks if chunk.poi_type == "village"]
+    print(f"Seed {world.seed}: {len(chunks)} chunks in region ({x0},{y0})-({x1},{y1}), {len(villages)} villages")
+
+    start = time.perf_counter()
+    written, size = generate_terrain(world, chunks, args.out + ".chunks", args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Terrain: {written} chunks in {elapsed:.2f}s ({written / max(elapsed, 1e-9):.0f} chunks/s, "
+          f"{args.workers} workers), {size / 1024:.1f} KiB")
+
+    if not args.no_llm and villages:
+        world.llm = llm = LLMRequestQueue(world._call_ollama, workers=args.llm_concurrency)
+        start = time.perf_counter()
+        prewarm_lore(world, villages, llm)
+        print(f"Lore: {len(villages)} villages in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        world.generate_chunks(villages)
+        print(f"Villages: {len(villages)} chunks in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        calls_before = llm.stats["completed"]
+        decorated, total = prewarm_interiors(world, villages)
+        llm.close()
+        print(f"Interiors: {decorated} of {total} buildings from {llm.stats['completed'] - calls_before} LLM layouts "
+              f"in {time.perf_counter() - start:.2f}s (mean call {llm.stats['call_seconds'] / max(llm.stats['completed'], 1):.2f}s)")
+
+        for prompt_key, stats in world.structured.report().items():
+            print(f"  {prompt_key}: {stats['requests']} requests, {stats['calls_per_request']:.2f} calls each, "
+                  f"{stats['repair_rate']:.0%} repaired locally, {stats['failure_rate']:.0%} failed")
+
+    world._find_starting_position()
+    size = save_world(world, args.out + ".dat")
+    print(f"Save: {size} bytes. Total {time.perf_counter() - total_start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
+import numpy as np
 import tcod
 from config import SCREEN_WIDTH_TILES, SCREEN_HEIGHT_TILES, WORLD_WIDTH, WORLD_HEIGHT
 from data.items import ITEM_DEFINITIONS
+from data.tiles import COLORS
+from entities.store import KIND_CHARS, KIND_COLORS, KIND_MOBILE, AVATAR_KIND
+from rendering.visibility import VisibilityCache
 
-def draw(console: tcod.console.Console, world) -> None:
-    """Draws the world on the given console."""
+_visibility = VisibilityCache()
+
+def draw(console: tcod.console.Console, world, frame_stats=None) -> None:
+    """Draws the world on the given console. frame_stats, if given, is shown in the info menu."""
     console.clear()
 
     # --- MAP DRAWING OFFSET CALCULATION ---
@@ -13,12 +19,28 @@ def draw(console: tcod.console.Console, world) -> None:
     start_y = max(0, min(start_y, WORLD_HEIGHT - console.height))
 
     if world.game_state == "PLAYING":
-        for y_offset in range(console.height):
-            for x_offset in range(console.width):
-                map_x, map_y = start_x + x_offset, start_y + y_offset
-                tile = world.get_tile_at(map_x, map_y)
-                if tile:
-                    console.rgb[x_offset, y_offset] = (tile.char, tile.color, (0, 0, 0))
+        # --- TILES, one region query for the whole viewport (console is [x, y]) ---
+        region = world.get_tile_region(start_x, start_y, console.width, console.height)
+        console.rgb["ch"] = region.chars.T
+        console.rgb["fg"] = region.colors.transpose(1, 0, 2)
+        console.rgb["bg"] = 0
+
+        # --- FIELD OF VIEW ---
+        visible, light = _visibility.compute(world, start_x, start_y, console.width, console.height)
+
+        # --- ENTITY DRAWING (trees, NPCs), straight from the store's columns ---
+        store = world.entities
+        indices = store.query_rect(start_x, start_y, console.width, console.height)
+        screen_x = store.x[indices] - start_x
+        screen_y = store.y[indices] - start_y
+        kinds = store.kind[indices]
+        shown = visible[screen_y, screen_x] | ~KIND_MOBILE[kinds] # Moving entities are hidden out of sight
+        console.rgb["ch"][screen_x[shown], screen_y[shown]] = KIND_CHARS[kinds[shown]]
+        console.rgb["fg"][screen_x[shown], screen_y[shown]] = KIND_COLORS[kinds[shown]]
+
+        # --- LIGHTING ---
+        fg = console.rgb["fg"]
+        console.rgb["fg"] = (fg * light.T[..., np.newaxis]).astype(np.uint8) # console is [x, y]
 
         # --- PLAYER DRAWING ---
         player_screen_x = world.player.x - start_x
@@ -26,15 +48,8 @@ def draw(console: tcod.console.Console, world) -> None:
         if 0 <= player_screen_x < console.width and 0 <= player_screen_y < console.height:
             console.rgb[player_screen_x, player_screen_y] = (world.player.char, world.player.color, (0, 0, 0))
 
-        # --- NPC DRAWING ---
-        for npc in world.npcs + world.village_npcs:
-            npc_screen_x = npc.x - start_x
-            npc_screen_y = npc.y - start_y
-            if 0 <= npc_screen_x < console.width and 0 <= npc_screen_y < console.height:
-                console.rgb[npc_screen_x, npc_screen_y] = (npc.char, npc.color, (0, 0, 0))
-
     elif world.game_state == "INFO_MENU":
-        draw_info_menu(console, world)
+        draw_info_menu(console, world, frame_stats)
 
     draw_chat_log(console, world)
 
@@ -73,6 +88,33 @@ def draw(console: tcod.console.Console, world) -> None:
     # Print the text inside the border
     console.print(x=1, y=1, string=cursor_info_text, fg=(255, 0, 0)) # Bright Red text, no background as frame handles it
 
+def draw_remote(console: tcod.console.Console, client) -> None:
+    """Draws a server client's mirrored viewport (see net/client.py). No FOV or lighting: the server sends the raw view."""
+    console.clear()
+    if client.origin is not None:
+        start_x, start_y = client.origin
+        region = client.region()
+        width, height = min(console.width, client.view_width), min(console.height, client.view_height)
+        console.rgb["ch"][:width, :height] = region.chars[:height, :width].T
+        console.rgb["fg"][:width, :height] = region.colors[:height, :width].transpose(1, 0, 2)
+
+        for x, y, kind in client.entities.values():
+            screen_x, screen_y = x - start_x, y - start_y
+            if not (0 <= screen_x < width and 0 <= screen_y < height):
+                continue
+            if kind == AVATAR_KIND:
+                console.rgb[screen_x, screen_y] = (ord("@"), COLORS["other_player_fg"], (0, 0, 0))
+            else:
+                console.rgb[screen_x, screen_y] = (KIND_CHARS[kind], KIND_COLORS[kind], (0, 0, 0))
+
+        player_x, player_y, player_hp = client.player
+        screen_x, screen_y = player_x - start_x, player_y - start_y
+        if 0 <= screen_x < width and 0 <= screen_y < height:
+            console.rgb[screen_x, screen_y] = (ord("@"), COLORS["player_fg"], (0, 0, 0))
+        console.print(x=1, y=1, string=f"Player {client.client_id}  HP: {player_hp}", fg=(255, 255, 255))
+
+    draw_chat_log(console, client)
+
 def draw_chat_log(console: tcod.console.Console, world) -> None:
     chat_width = console.width // 2
     chat_height = 10
@@ -95,7 +137,7 @@ def draw_chat_log(console: tcod.console.Console, world) -> None:
     for i, message in enumerate(display_messages):
         console.print(x=chat_x + 1, y=chat_y + 1 + i, string=message, fg=(200, 200, 200))
 
-def draw_info_menu(main_console: tcod.console.Console, world) -> None:
+def draw_info_menu(main_console: tcod.console.Console, world, frame_stats=None) -> None:
     """Draws the information menu as a pop-up."""
     menu_width = 40
     menu_height = 20
@@ -118,7 +160,47 @@ def draw_info_menu(main_console: tcod.console.Console, world) -> None:
     ui_y = menu_y + 2
     hp_text = f"HP: {world.player.hp} / {world.player.max_hp}"
     main_console.print(x=menu_x + 2, y=ui_y, string=hp_text, fg=(255, 255, 255))
-    ui_y += 2
+    ui_y += 1
+
+    # Draw clock and simulation detail tiers
+    minutes = int(world.world_minutes)
+    clock_text = f"Day {minutes // 1440 + 1}, {minutes // 60 % 24:02d}:{minutes % 60:02d}"
+    main_console.print(x=menu_x + 2, y=ui_y, string=clock_text, fg=(200, 200, 200))
+    ui_y += 1
+    stats = world.get_simulation_stats()
+    lod_text = f"Sim: {stats['full_entities']} near / {stats['coarse_entities']} far"
+    main_console.print(x=menu_x + 2, y=ui_y, string=lod_text, fg=(200, 200, 200))
+    ui_y += 1
+
+    # Draw frame pacing and background work
+    if frame_stats is not None:
+        pacing = frame_stats.summary()
+        frame_text = f"Frame: {pacing['fps']:.0f} fps, p95 {pacing['p95_ms']:.1f} ms"
+        main_console.print(x=menu_x + 2, y=ui_y, string=frame_text, fg=(200, 200, 200))
+        ui_y += 1
+    background = world.get_background_stats()
+    background_text = f"Queued: {background['pending_chunks']} chunks, {background['pending_llm']} LLM"
+    main_console.print(x=menu_x + 2, y=ui_y, string=background_text, fg=(200, 200, 200))
+    ui_y += 1
+    dialogue = world.llm.prompt_report().get("dialogue")
+    if dialogue:
+        prompt_text = f"Prompt: {dialogue['last_prompt_tokens']} tok (max {dialogue['max_prompt_tokens']}), {dialogue['mean_call_seconds']:.1f}s"
+        main_console.print(x=menu_x + 2, y=ui_y, string=prompt_text, fg=(200, 200, 200))
+        ui_y += 1
+    structured = world.structured.report()
+    if structured:
+        requests = sum(stats["requests"] for stats in structured.values())
+        repaired = sum(stats["repaired"] for stats in structured.values())
+        failed = sum(stats["failures"] for stats in structured.values())
+        json_text = f"JSON: {requests} req, {repaired / requests:.0%} fixed, {failed / requests:.0%} failed"
+        main_console.print(x=menu_x + 2, y=ui_y, string=json_text, fg=(200, 200, 200))
+        ui_y += 1
+    prefetch = world.get_prefetch_stats()
+    if prefetch["issued"]:
+        prefetch_text = f"Greetings: {prefetch['hit_rate']:.0%} ready, {prefetch['wasted']} wasted"
+        main_console.print(x=menu_x + 2, y=ui_y, string=prefetch_text, fg=(200, 200, 200))
+        ui_y += 1
+    ui_y += 1
 
     # Draw Inventory
     main_console.print(x=menu_x + 2, y=ui_y, string="Inventory:", fg=(255, 255, 255))
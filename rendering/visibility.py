@@ -0,0 +1,73 @@
+# rendering/visibility.py
+import numpy as np
+import tcod.constants
+import tcod.map
+from config import (
+    FOV_RADIUS, FOV_HIDDEN_BRIGHTNESS, NIGHT_START_HOUR, NIGHT_END_HOUR,
+    LIGHT_RADIUS_NIGHT, NIGHT_AMBIENT, LIGHT_RADIUS_INTERIOR, INTERIOR_AMBIENT,
+)
+
+def get_light_settings(world):
+    """Returns (light_radius, ambient) for the player's surroundings. A radius of None means daylight."""
+    if world.get_building_at(world.player.x, world.player.y):
+        return LIGHT_RADIUS_INTERIOR, INTERIOR_AMBIENT
+    hour = int(world.world_minutes // 60) % 24
+    if hour >= NIGHT_START_HOUR or hour < NIGHT_END_HOUR:
+        return LIGHT_RADIUS_NIGHT, NIGHT_AMBIENT
+    return None, 1.0
+
+class VisibilityCache:
+    """Field of view and light map for a viewport, recomputed only when the player moves or tiles in sight change."""
+    def __init__(self):
+        self.key = None
+        self.visible = None # (height, width) bool array
+        self.light = None   # (height, width) float32 brightness multipliers
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, world, x, y, width, height, light_radius, ambient):
+        # Only tiles within sight of the player matter, so chunks changing elsewhere
+        # (off-screen prefetch, other players' edits) keep the cached result
+        px, py = world.player.x, world.player.y
+        x0, y0, x1, y1 = x, y, x + width, y + height
+        if FOV_RADIUS:
+            x0, y0 = max(x0, px - FOV_RADIUS), max(y0, py - FOV_RADIUS)
+            x1, y1 = min(x1, px + FOV_RADIUS + 1), min(y1, py + FOV_RADIUS + 1)
+        version = world.tile_version(x0, y0, x1 - x0, y1 - y0)
+        return (px, py, x, y, width, height, version, light_radius, ambient)
+
+    def compute(self, world, x, y, width, height):
+        """Returns (visible, light) arrays for the rectangle at (x, y), indexed [y, x]."""
+        light_radius, ambient = get_light_settings(world)
+        key = self._key(world, x, y, width, height, light_radius, ambient)
+        if key == self.key:
+            self.hits += 1
+            return self.visible, self.light
+        self.misses += 1
+
+        pov_y, pov_x = world.player.y - y, world.player.x - x
+        if not (0 <= pov_x < width and 0 <= pov_y < height):
+            visible = np.zeros((height, width), dtype=bool)
+        else:
+            transparency = world.get_transparency_map(x, y, width, height)
+            visible = tcod.map.compute_fov(
+                transparency,
+                (pov_y, pov_x),
+                radius=FOV_RADIUS,
+                light_walls=True,
+                algorithm=tcod.constants.FOV_SYMMETRIC_SHADOWCAST,
+            )
+
+        if light_radius is None:
+            lit = np.ones((height, width), dtype=np.float32)
+        else:
+            yy, xx = np.ogrid[:height, :width]
+            distance = np.sqrt((yy - pov_y) ** 2 + (xx - pov_x) ** 2, dtype=np.float32)
+            falloff = np.clip(1.0 - distance / light_radius, 0.0, 1.0)
+            lit = np.maximum(falloff, ambient).astype(np.float32)
+        light = np.where(visible, lit, np.float32(min(FOV_HIDDEN_BRIGHTNESS, ambient))).astype(np.float32)
+
+        # Taken again: the transparency map may have just generated chunks in view
+        self.key = self._key(world, x, y, width, height, light_radius, ambient)
+        self.visible, self.light = visible, light
+        return visible, light
@@ -0,0 +1,54 @@
+# server.py
+"""Runs the world as a local game server that several clients can join.
+
+Usage: python server.py --seed 1234
+       python server.py worlds/mine.dat (a save, with pregenerated terrain beside it if present)
+Join with: python client.py
+"""
+import argparse
+import asyncio
+import os
+from cli import seed_arg
+from config import SERVER_HOST, SERVER_PORT, AUTOSAVE_PATH
+from engine import World
+from net.server import GameServer
+from persistence.autosave import AutosaveService
+from persistence.chunk_storage import ChunkStorage
+from persistence.save import load_world
+
+async def serve(world, host, port):
+    autosave = AutosaveService(world, AUTOSAVE_PATH)
+    server = GameServer(world, host, port, autosave=autosave)
+    port = await server.start()
+    print(f"Serving seed {world.seed} on {host}:{port}")
+    try:
+        await server.run()
+    finally:
+        await server.close()
+        world.llm.close(wait=False)
+        autosave.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local game server.")
+    parser.add_argument("save", nargs="?", help="Save file to serve instead of a new world")
+    parser.add_argument("--seed", type=seed_arg, help="Seed for a new world")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    args = parser.parse_args()
+
+    if args.save:
+        chunk_storage = None
+        chunks_path = os.path.splitext(args.save)[0] + ".chunks"
+        if os.path.exists(chunks_path):
+            chunk_storage = ChunkStorage(chunks_path)
+        world = load_world(args.save, chunk_storage)
+    else:
+        world = World(seed=args.seed)
+
+    try:
+        asyncio.run(serve(world, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
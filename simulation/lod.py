@@ -0,0 +1,216 @@
+# simulation/lod.py
+import random
+import numpy as np
+from entities.base import NPC
+from config import (
+    CHUNK_SIZE, LOD_FULL_RADIUS, LOD_DEMOTE_RADIUS, NPC_MOVE_INTERVAL,
+    COARSE_UPDATE_MINUTES, VILLAGE_POPULATION_MIN, VILLAGE_POPULATION_MAX,
+)
+from data.villagers import (
+    VILLAGER_NAMES, VILLAGER_PERSONALITIES, VILLAGER_ATTITUDES, VILLAGER_ROLES,
+    VILLAGER_SCHEDULE, VILLAGER_ACTIVITY_DESCRIPTIONS,
+)
+
+FULL_TIER = "full"
+COARSE_TIER = "coarse"
+
+MINUTES_PER_DAY = 24 * 60
+MAX_STEPS_PER_UPDATE = 4 # Don't replay a long stall step by step
+
+def activity_at(world_minutes):
+    """Returns the scheduled villager activity for an in-game time."""
+    hour = int(world_minutes // 60) % 24
+    activity = VILLAGER_SCHEDULE[-1][1]
+    for start_hour, name in VILLAGER_SCHEDULE:
+        if hour >= start_hour:
+            activity = name
+    return activity
+
+class VillagePopulation:
+    """Aggregate, LLM-free state of a village's residents."""
+    def __init__(self, chunk_x, chunk_y, population):
+        self.chunk_x = chunk_x
+        self.chunk_y = chunk_y
+        self.tier = COARSE_TIER
+        self.next_resident_id = 0
+        self.residents = [] # Plain dicts while coarse, the source for NPCs on promotion
+        for _ in range(population):
+            self._add_resident()
+        self.npcs = [] # Live NPC objects, only while at full detail
+        self.activity = "leisure"
+        self.summary = ""
+        self.last_update_minutes = None
+
+    @property
+    def population(self):
+        return len(self.residents)
+
+    def _add_resident(self):
+        self.residents.append({
+            "npc_id": f"villager:{self.chunk_x}:{self.chunk_y}:{self.next_resident_id}",
+            "name": random.choice(VILLAGER_NAMES),
+            "personality": random.choice(VILLAGER_PERSONALITIES),
+            "attitude_to_player": random.choice(VILLAGER_ATTITUDES),
+            "role": random.choice(VILLAGER_ROLES),
+            "last_speech_time": 0,
+        })
+        self.next_resident_id += 1
+
+    def sync_residents(self):
+        """Copies state from live NPCs back into the resident records."""
+        by_id = {resident["npc_id"]: resident for resident in self.residents}
+        for npc in self.npcs:
+            resident = by_id.get(npc.npc_id)
+            if resident:
+                resident["last_speech_time"] = npc.last_speech_time
+
+    def update_coarse(self, world_minutes):
+        """Advances the aggregate state to the given time without touching tiles."""
+        if self.last_update_minutes is not None:
+            elapsed_days = int(world_minutes // MINUTES_PER_DAY - self.last_update_minutes // MINUTES_PER_DAY)
+            for _ in range(elapsed_days):
+                roll = random.random()
+                if roll < 0.1 and self.population < VILLAGE_POPULATION_MAX:
+                    self._add_resident()
+                elif roll > 0.95 and self.population > VILLAGE_POPULATION_MIN:
+                    self.residents.pop(random.randrange(self.population))
+        self.last_update_minutes = world_minutes
+        self.activity = activity_at(world_minutes)
+        self.summary = f"{self.population} villagers, mostly {VILLAGER_ACTIVITY_DESCRIPTIONS[self.activity]}."
+
+class SimulationLOD:
+    """Simulates NPCs near the player every tick and distant villages as per-chunk aggregates."""
+    def __init__(self, world):
+        self.world = world
+        self.villages = {} # (chunk_x, chunk_y) -> VillagePopulation
+        for chunk_y, row in enumerate(world.chunks):
+            for chunk_x, chunk in enumerate(row):
+                if chunk.poi_type == "village":
+                    population = random.randint(VILLAGE_POPULATION_MIN, VILLAGE_POPULATION_MAX)
+                    chunk.population = VillagePopulation(chunk_x, chunk_y, population)
+                    chunk.population.update_coarse(world.world_minutes)
+                    self.villages[(chunk_x, chunk_y)] = chunk.population
+        self.player_chunk = None
+        self.move_timer = 0.0
+        self.last_coarse_minutes = world.world_minutes
+
+    def update(self, dt):
+        """Re-tiers villages around the player, then runs the full and coarse updates."""
+        player_chunk = (self.world.player.x // CHUNK_SIZE, self.world.player.y // CHUNK_SIZE)
+        if player_chunk != self.player_chunk:
+            self.player_chunk = player_chunk
+            self._retier()
+
+        self.move_timer += dt
+        steps = int(self.move_timer // NPC_MOVE_INTERVAL)
+        self.move_timer -= steps * NPC_MOVE_INTERVAL
+        for _ in range(min(steps, MAX_STEPS_PER_UPDATE)):
+            self._step_full_tier()
+
+        if self.world.world_minutes - self.last_coarse_minutes >= COARSE_UPDATE_MINUTES:
+            self.last_coarse_minutes = self.world.world_minutes
+            for village in self.villages.values():
+                if village.tier == COARSE_TIER:
+                    village.update_coarse(self.world.world_minutes)
+
+    def _chunk_distance(self, chunk_pos):
+        return max(abs(chunk_pos[0] - self.player_chunk[0]), abs(chunk_pos[1] - self.player_chunk[1]))
+
+    def _retier(self):
+        for chunk_pos, village in self.villages.items():
+            distance = self._chunk_distance(chunk_pos)
+            if village.tier == COARSE_TIER and distance <= LOD_FULL_RADIUS:
+                self._promote(village)
+            elif village.tier == FULL_TIER and distance > LOD_DEMOTE_RADIUS:
+                self._demote(village)
+
+    def _promote(self, village):
+        """Turns a village's aggregate residents into live NPCs placed by their schedule."""
+        village.update_coarse(self.world.world_minutes)
+        chunk = self.world.chunks[village.chunk_y][village.chunk_x]
+        if not chunk.is_generated:
+            self.world._generate_chunk_detail(chunk)
+
+        for resident in village.residents:
+            x, y = self._spawn_position(chunk, village, village.activity)
+            npc = NPC(
+                self.world.entities,
+                x=x,
+                y=y,
+                name=resident["name"],
+                personality=resident["personality"],
+                family_ties=f"a {resident['role']} of the village",
+                attitude_to_player=resident["attitude_to_player"],
+                npc_id=resident["npc_id"],
+                home_chunk=(village.chunk_x, village.chunk_y),
+                role=resident["role"],
+            )
+            npc.activity = village.activity
+            npc.last_speech_time = resident["last_speech_time"]
+            village.npcs.append(npc)
+            self.world.village_npcs.append(npc)
+        village.tier = FULL_TIER
+
+    def _demote(self, village):
+        """Folds a village's live NPCs back into its aggregate residents."""
+        village.sync_residents()
+        for npc in village.npcs:
+            self.world.village_npcs.remove(npc)
+            self.world.entities.remove(npc.index)
+        village.npcs = []
+        village.tier = COARSE_TIER
+        village.update_coarse(self.world.world_minutes)
+
+    def _spawn_position(self, chunk, village, activity):
+        """Picks a passable tile in the village that fits the activity (indoors when sleeping)."""
+        origin_x, origin_y = village.chunk_x * CHUNK_SIZE, village.chunk_y * CHUNK_SIZE
+        walkable = self.world.get_walkable_region(origin_x, origin_y, CHUNK_SIZE, CHUNK_SIZE)
+        inside = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=bool)
+        for building in chunk.village.buildings:
+            inside[building.y:building.y + building.height, building.x:building.x + building.width] = True
+        ys, xs = np.nonzero(walkable & inside)
+        indoors = list(zip((origin_x + xs).tolist(), (origin_y + ys).tolist()))
+        ys, xs = np.nonzero(walkable & ~inside)
+        outdoors = list(zip((origin_x + xs).tolist(), (origin_y + ys).tolist()))
+        candidates = indoors if activity == "sleeping" and indoors else outdoors or indoors
+        if not candidates:
+            return origin_x + CHUNK_SIZE // 2, origin_y + CHUNK_SIZE // 2
+        return random.choice(candidates)
+
+    def _step_full_tier(self):
+        """Moves every NPC near the player one step according to its schedule."""
+        for npc in self.world.npcs:
+            if self._chunk_distance((npc.x // CHUNK_SIZE, npc.y // CHUNK_SIZE)) <= LOD_FULL_RADIUS:
+                self._step_npc(npc)
+        for village in self.villages.values():
+            if village.tier != FULL_TIER:
+                continue
+            village.activity = activity_at(self.world.world_minutes)
+            for npc in village.npcs:
+                npc.activity = village.activity
+                if npc.activity != "sleeping":
+                    self._step_npc(npc)
+
+    def _step_npc(self, npc):
+        if random.random() < 0.5: # Idle about half the time
+            return
+        dx, dy = random.choice([(0, -1), (0, 1), (-1, 0), (1, 0)])
+        new_x, new_y = npc.x + dx, npc.y + dy
+        if npc.home_chunk and (new_x // CHUNK_SIZE, new_y // CHUNK_SIZE) != npc.home_chunk:
+            return
+        if (new_x, new_y) == (self.world.player.x, self.world.player.y):
+            return
+        if self.world.is_walkable(new_x, new_y):
+            npc.x, npc.y = new_x, new_y
+
+    def stats(self):
+        """Returns how many villages and entities are currently in each tier."""
+        result = {"full_villages": 0, "coarse_villages": 0, "full_entities": 0, "coarse_entities": 0}
+        for village in self.villages.values():
+            result[f"{village.tier}_villages"] += 1
+            result[f"{village.tier}_entities"] += village.population
+        for npc in self.world.npcs:
+            in_range = self.player_chunk is not None and \
+                self._chunk_distance((npc.x // CHUNK_SIZE, npc.y // CHUNK_SIZE)) <= LOD_FULL_RADIUS
+            result["full_entities" if in_range else "coarse_entities"] += 1
+        return result
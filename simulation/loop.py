@@ -0,0 +1,55 @@
+# simulation/loop.py
+from collections import deque
+import numpy as np
+from config import SIM_TICK_RATE, MAX_TICKS_PER_FRAME, FRAME_STATS_WINDOW
+
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed-length simulation ticks."""
+    def __init__(self, tick_rate=SIM_TICK_RATE, max_ticks=MAX_TICKS_PER_FRAME):
+        self.tick_seconds = 1.0 / tick_rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+        self.dropped_ticks = 0 # Ticks skipped after long stalls
+
+    def advance(self, frame_seconds):
+        """Adds a frame's elapsed time and returns how many ticks to run."""
+        self.accumulator += frame_seconds
+        ticks = int(self.accumulator // self.tick_seconds)
+        self.accumulator -= ticks * self.tick_seconds
+        if ticks > self.max_ticks:
+            self.dropped_ticks += ticks - self.max_ticks
+            ticks = self.max_ticks
+        return ticks
+
+class FrameStats:
+    """Rolling frame pacing metrics over the last few frames."""
+    def __init__(self, window=FRAME_STATS_WINDOW):
+        self.frame_times = deque(maxlen=window) # Whole loop iteration, including pacing sleeps
+        self.work_times = deque(maxlen=window)  # Events, simulation, drawing and background work
+        self.ticks = deque(maxlen=window)
+        self.over_budget = 0  # Frames whose foreground work left no time for background work
+        self.frames = 0
+
+    def record(self, frame_seconds, work_seconds, ticks, over_budget):
+        self.frame_times.append(frame_seconds)
+        self.work_times.append(work_seconds)
+        self.ticks.append(ticks)
+        self.over_budget += over_budget
+        self.frames += 1
+
+    def summary(self):
+        if not self.frame_times:
+            return {"fps": 0.0, "frame_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "work_ms": 0.0,
+                    "work_p95_ms": 0.0, "ticks_per_second": 0.0, "over_budget": self.over_budget}
+        frame_times = np.fromiter(self.frame_times, dtype=float)
+        total = frame_times.sum()
+        return {
+            "fps": float(len(frame_times) / total) if total else 0.0,
+            "frame_ms": float(frame_times.mean() * 1000),
+            "p95_ms": float(np.percentile(frame_times, 95) * 1000),
+            "max_ms": float(frame_times.max() * 1000),
+            "work_ms": float(np.mean(self.work_times) * 1000),
+            "work_p95_ms": float(np.percentile(self.work_times, 95) * 1000),
+            "ticks_per_second": float(sum(self.ticks) / total) if total else 0.0,
+            "over_budget": self.over_budget,
+        }
@@ -0,0 +1,33 @@
+# tests/conftest.py
+import json
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import World
+
+NPC_REPLY = json.dumps({"name": "Elara", "personality": "wise", "family_ties": "none",
+                        "attitude_to_player": "helpful", "dialogue": ["Hello!"]})
+
+def fake_ollama(self, prompt, schema=None):
+    """Stands in for the Ollama server: NPC prompts get a valid personality, everything else plain text."""
+    if "NPC" in prompt:
+        return NPC_REPLY
+    return "Some lore."
+
+@pytest.fixture
+def make_world(monkeypatch):
+    """Builds worlds whose LLM calls never leave the process."""
+    monkeypatch.setattr(World, "_call_ollama", fake_ollama)
+    worlds = []
+
+    def make(seed=1234, **kwargs):
+        world = World(seed=seed, **kwargs)
+        worlds.append(world)
+        return world
+
+    yield make
+    for world in worlds:
+        world.llm.close(wait=False)
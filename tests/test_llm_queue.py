@@ -0,0 +1,55 @@
+# tests/test_llm_queue.py
+import threading
+from llm.queue import LLMRequestQueue
+
+def _drain(llm, timeout=5.0):
+    """llm.drain() that fails the test instead of hanging it."""
+    thread = threading.Thread(target=llm.drain, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "drain() did not return"
+
+def test_failing_call_still_answers():
+    def call(prompt):
+        if prompt == "bad":
+            raise RuntimeError("model crashed")
+        return prompt.upper()
+
+    llm = LLMRequestQueue(call, workers=1)
+    results = []
+    for prompt in ("bad", "ok", "bad", "fine"):
+        llm.submit(prompt, results.append)
+    _drain(llm)
+    assert results == ["", "OK", "", "FINE"]
+    assert llm.in_flight == 0
+    llm.close()
+
+def test_submit_after_close_answers_empty():
+    llm = LLMRequestQueue(lambda prompt: prompt, workers=1)
+    llm.submit("first", lambda response: None)
+    _drain(llm)
+    llm.close()
+    results = []
+    assert llm.submit("late", results.append)
+    _drain(llm)
+    assert results == [""]
+    assert llm.in_flight == 0
+
+def test_drain_after_close_skips_dropped_requests():
+    started, release = threading.Event(), threading.Event()
+
+    def call(prompt):
+        started.set()
+        release.wait()
+        return prompt
+
+    llm = LLMRequestQueue(call, workers=1)
+    results = []
+    for prompt in ("running", "queued", "queued too"):
+        llm.submit(prompt, results.append)
+    started.wait()
+    llm.close(wait=False) # Drops the two requests that have not started
+    release.set()
+    _drain(llm)
+    assert results == ["running"]
+    assert llm.in_flight == 0
@@ -0,0 +1,32 @@
+# tests/test_movement.py
+import numpy as np
+from config import CHUNK_SIZE
+from tile_types import TILES, tile_id
+
+def _walk_onto(world, tile_key):
+    """Puts the player next to a walkable tile of the given kind and steps onto it; returns its position."""
+    for chunk in (chunk for row in world.chunks for chunk in row if chunk.poi_type != "village"):
+        x0, y0 = chunk.chunk_x * CHUNK_SIZE, chunk.chunk_y * CHUNK_SIZE
+        region = world.get_tile_region(x0, y0, CHUNK_SIZE, CHUNK_SIZE)
+        ys, xs = np.nonzero(region.tile_ids[:, 1:] == tile_id(tile_key)) # Leave room to step in from the left
+        for x, y in zip((xs + 1 + x0).tolist(), (ys + y0).tolist()):
+            if world.is_walkable(x, y):
+                world.player.x, world.player.y = x - 1, y
+                world.handle_player_movement(1, 0)
+                return x, y
+    raise AssertionError(f"No walkable {tile_key} tile in the world")
+
+def test_walking_on_snow_picks_nothing_up(make_world):
+    world = make_world(seed=5)
+    world.player.inventory.clear()
+    x, y = _walk_onto(world, "snow")
+    assert (world.player.x, world.player.y) == (x, y)
+    assert world.player.inventory == {}
+    assert world.get_tile_at(x, y) is TILES[tile_id("snow")]
+
+def test_walking_on_a_flower_picks_it(make_world):
+    world = make_world(seed=5)
+    world.player.inventory.clear()
+    x, y = _walk_onto(world, "flower")
+    assert world.player.inventory == {"flower": 1}
+    assert world.get_tile_at(x, y) is TILES[tile_id("plains")]
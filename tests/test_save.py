@@ -0,0 +1,33 @@
+# tests/test_save.py
+import numpy as np
+from entities.store import TREE_KIND_IDS, STATE_ACTIVE
+from entities.tree import Tree
+from persistence.save import save_world, load_world
+
+def _fell_tree_near_player(world):
+    """Chops down the tree nearest the player and returns its position."""
+    world.get_tile_region(world.player.x - 16, world.player.y - 16, 32, 32) # Generate the chunks around
+    store = world.entities
+    trees = np.flatnonzero(np.isin(store.kind[:store.size], TREE_KIND_IDS) & (store.state[:store.size] == STATE_ACTIVE))
+    distances = np.abs(store.x[trees] - world.player.x) + np.abs(store.y[trees] - world.player.y)
+    tree = store.get(int(trees[np.argmin(distances)]), Tree)
+    position = (tree.x, tree.y)
+    while store.state[tree.index] == STATE_ACTIVE:
+        world.harvest_tree(tree)
+    return position
+
+def test_npc_on_felled_tree_survives_reload(make_world, tmp_path):
+    world = make_world(seed=5)
+    x, y = _fell_tree_near_player(world)
+    npc = world.npcs[0]
+    npc.x, npc.y = x, y
+    path = str(tmp_path / "world.dat")
+    save_world(world, path)
+
+    loaded = load_world(path)
+    loaded.get_tile_at(x, y) # Generates the chunk and replays its delta
+    loaded_npc = next(other for other in loaded.npcs if other.npc_id == npc.npc_id)
+    assert loaded.entities.state[loaded_npc.index] == STATE_ACTIVE
+    assert (loaded_npc.x, loaded_npc.y) == (x, y)
+    assert loaded.entities.index_at(x, y, kinds=TREE_KIND_IDS) is None
+    loaded.llm.close(wait=False)
@@ -0,0 +1,27 @@
+# tests/test_visibility.py
+from config import WORLD_WIDTH, WORLD_HEIGHT
+from rendering.visibility import VisibilityCache
+
+def _view(world, width=40, height=30):
+    return world.player.x - width // 2, world.player.y - height // 2, width, height
+
+def test_changes_out_of_sight_keep_the_fov(make_world):
+    world = make_world()
+    world.player.x, world.player.y = 30, 30
+    cache = VisibilityCache()
+    cache.compute(world, *_view(world))
+    world.set_tile(WORLD_WIDTH - 1, WORLD_HEIGHT - 1, "wood_wall")
+    world.get_tile_at(WORLD_WIDTH - 25, 5) # Generates a far chunk, as prefetch does
+    cache.compute(world, *_view(world))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_changes_in_sight_recompute_the_fov(make_world):
+    world = make_world()
+    world.player.x, world.player.y = 30, 30
+    cache = VisibilityCache()
+    cache.compute(world, *_view(world))
+    world.set_tile(world.player.x + 2, world.player.y, "wood_wall")
+    visible, _ = cache.compute(world, *_view(world))
+    assert (cache.hits, cache.misses) == (0, 2)
+    x, y, _, _ = _view(world)
+    assert not visible[world.player.y - y, world.player.x + 3 - x]
@@ -1,7 +1,61 @@
+import numpy as np
+from data.tiles import TILE_DEFINITIONS
+from data.decorations import DECORATION_ITEM_DEFINITIONS
+
 class Tile:
-    """The Tile class now stores a character, a color tuple, and a name."""
-    def __init__(self, char, color, passable, name):
+    """The Tile class now stores a character, a color tuple, a name and whether it blocks sight."""
+    def __init__(self, char, color, passable, name, transparent=True):
         self.char = ord(char)
         self.color = color
         self.passable = passable
         self.name = name
+        self.transparent = transparent
+
+# --- Tile Registry ---
+# Chunks store tile IDs (indices into these tables) instead of Tile objects.
+# TILES holds one shared Tile per ID for code that wants an object.
+_ALL_TILE_DEFINITIONS = {**TILE_DEFINITIONS, **DECORATION_ITEM_DEFINITIONS}
+TILE_KEYS = list(_ALL_TILE_DEFINITIONS.keys())
+TILE_IDS = {key: tile_id for tile_id, key in enumerate(TILE_KEYS)}
+TILES = [
+    Tile(d["char"], d["color"], d["passable"], d["name"], d.get("transparent", True))
+    for d in _ALL_TILE_DEFINITIONS.values()
+]
+TILE_CHARS = np.array([tile.char for tile in TILES], dtype=np.int32)
+TILE_COLORS = np.array([tile.color for tile in TILES], dtype=np.uint8)
+TILE_PASSABLE = np.array([tile.passable for tile in TILES], dtype=bool)
+TILE_TRANSPARENT = np.array([tile.transparent for tile in TILES], dtype=bool)
+TILE_ID_DTYPE = np.uint8
+
+def tile_id(key):
+    """Returns the numeric ID for a tile key from TILE_DEFINITIONS or DECORATION_ITEM_DEFINITIONS."""
+    return TILE_IDS[key]
+
+class TileRegion:
+    """Tile IDs for a rectangle of the world, indexed [y, x], with array lookups of their properties.
+
+    known is False for tiles outside the world and, when the region was read without
+    generating, for tiles of chunks that do not exist yet. Their ID is 0 and they count
+    as neither passable nor transparent.
+    """
+    def __init__(self, x, y, tile_ids, known):
+        self.x = x
+        self.y = y
+        self.tile_ids = tile_ids
+        self.known = known
+
+    @property
+    def chars(self):
+        return np.where(self.known, TILE_CHARS[self.tile_ids], ord(" "))
+
+    @property
+    def colors(self):
+        return np.where(self.known[..., np.newaxis], TILE_COLORS[self.tile_ids], np.uint8(0))
+
+    @property
+    def passable(self):
+        return TILE_PASSABLE[self.tile_ids] & self.known
+
+    @property
+    def transparent(self):
+        return TILE_TRANSPARENT[self.tile_ids] & self.known
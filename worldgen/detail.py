@@ -0,0 +1,95 @@
+# worldgen/detail.py
+import numpy as np
+import tcod.noise
+from config import CHUNK_SIZE, DETAIL_NOISE_SCALE
+from data.biomes import BIOME_DETAIL_RULES
+from entities.store import KIND_IDS
+from tile_types import TILE_PASSABLE, TILE_ID_DTYPE, tile_id
+from worldgen.terrain import BIOME_NAMES, chunk_tile_coords
+
+class DetailGenerator:
+    """Places tall grass, flowers and trees for whole chunks with array operations."""
+    def __init__(self, seed):
+        self.seed = seed
+        self.patch_noise = tcod.noise.Noise(
+            dimensions=2,
+            algorithm=tcod.noise.Algorithm.SIMPLEX,
+            seed=seed
+        )
+
+    def chunk_rng(self, chunk_x, chunk_y):
+        """Per-chunk random generator, so a chunk comes out the same however it is batched."""
+        return np.random.default_rng([self.seed, chunk_x, chunk_y])
+
+    def _patch_field(self, chunk_coords, layer):
+        """Smooth noise in [-1, 1] over every tile of the chunks, shaped (chunks, CHUNK_SIZE, CHUNK_SIZE)."""
+        xs, ys = chunk_tile_coords(chunk_coords)
+        # Each layer samples a far-off band of the noise so rules get independent patches
+        mgrid = np.stack([xs * DETAIL_NOISE_SCALE, ys * DETAIL_NOISE_SCALE + layer * 1000.0])
+        return self.patch_noise.sample_mgrid(mgrid)
+
+    def _placement_mask(self, rule, uniforms, chunk_coords, layer):
+        chance = rule["chance"]
+        patchiness = rule.get("patchiness", 0.0)
+        if patchiness:
+            chance = np.clip(chance * (1.0 + patchiness * self._patch_field(chunk_coords, layer)), 0.0, 1.0)
+        return uniforms < chance
+
+    def generate(self, chunk_coords, biome_maps):
+        """Generates a batch of chunks from their per-tile biome IDs.
+
+        Each biome's rules apply only to its own tiles, so a chunk can mix biomes.
+        Returns (tiles, trees): tiles is a (chunks, CHUNK_SIZE, CHUNK_SIZE) tile-ID array and
+        trees is a (kind_ids, xs, ys) tuple of arrays in world coordinates.
+        """
+        tiles = _BASE_TILES[biome_maps]
+        tree_parts = [(np.empty(0, dtype=np.uint8), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32))]
+        uniforms = np.stack([
+            self.chunk_rng(chunk_x, chunk_y).random((_LAYER_COUNT, CHUNK_SIZE, CHUNK_SIZE))
+            for chunk_x, chunk_y in chunk_coords
+        ], axis=1)
+
+        claimed = np.zeros(tiles.shape, dtype=bool)
+        for biome_id in np.unique(biome_maps).tolist():
+            in_biome = biome_maps == biome_id
+            for layer, rule in _DETAIL_LAYERS[biome_id]:
+                mask = self._placement_mask(rule, uniforms[layer], chunk_coords, layer) & in_biome & ~claimed
+                tiles[mask] = tile_id(rule["tile"])
+                claimed |= mask
+
+            tree_layer = _TREE_LAYERS[biome_id]
+            if tree_layer is None:
+                continue
+            layer, tree_rule = tree_layer
+            mask = self._placement_mask(tree_rule, uniforms[layer], chunk_coords, layer) & in_biome & TILE_PASSABLE[tiles]
+            chunk_index, ys, xs = np.nonzero(mask)
+            kinds = np.array([KIND_IDS[kind] for kind in tree_rule["kinds"]], dtype=np.uint8)
+            kind_ids = kinds[(uniforms[layer + 1][mask] * len(kinds)).astype(np.intp)]
+            coords = np.asarray(chunk_coords)
+            tree_parts.append((
+                kind_ids,
+                (coords[chunk_index, 0] * CHUNK_SIZE + xs).astype(np.int32),
+                (coords[chunk_index, 1] * CHUNK_SIZE + ys).astype(np.int32),
+            ))
+        trees = tuple(np.concatenate([part[column] for part in tree_parts]) for column in range(3))
+        return tiles, trees
+
+# --- Rule Layers ---
+# Every rule of every biome owns fixed random and noise layers (trees own two: placement
+# and kind), so a tile's details do not depend on which biomes share its batch.
+_BASE_TILES = np.array([tile_id(BIOME_DETAIL_RULES[name]["base"]) for name in BIOME_NAMES], dtype=TILE_ID_DTYPE)
+def _assign_layers():
+    detail_layers, tree_layers = [], []
+    count = 0
+    for name in BIOME_NAMES:
+        rules = BIOME_DETAIL_RULES[name]
+        detail_layers.append([(count + i, rule) for i, rule in enumerate(rules.get("details", []))])
+        count += len(detail_layers[-1])
+        if "trees" in rules:
+            tree_layers.append((count, rules["trees"]))
+            count += 2
+        else:
+            tree_layers.append(None)
+    return detail_layers, tree_layers, count
+
+_DETAIL_LAYERS, _TREE_LAYERS, _LAYER_COUNT = _assign_layers() # Indexed by biome ID
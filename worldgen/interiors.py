@@ -0,0 +1,77 @@
+# worldgen/interiors.py
+import json
+from config import INTERIOR_POOL_SIZE
+from data.decorations import DECORATION_ITEM_DEFINITIONS, DECORATION_SWAP_GROUPS
+
+# Interior layouts are pooled per building shape, since houses of one type and size
+# only differ in how they are furnished. A layout is a list of [item_type, x, y]
+# relative to the building origin. Pools live in World.llm_results, one key per
+# layout, so they are saved and autosaved like any other LLM output.
+
+_SWAPS = {item: group for group in DECORATION_SWAP_GROUPS for item in group}
+
+def layout_key(building_type, width, height, slot):
+    return f"interior_layout:{building_type}:{width}:{height}:{slot}"
+
+def get_pool(llm_results, building_type, width, height):
+    """Returns the stored layouts for a building shape."""
+    pool = []
+    for slot in range(INTERIOR_POOL_SIZE):
+        stored = llm_results.get(layout_key(building_type, width, height, slot))
+        if stored is not None:
+            pool.append(json.loads(stored))
+    return pool
+
+def add_to_pool(llm_results, building_type, width, height, layout):
+    """Stores a layout in the first free slot. Returns False if the pool is full."""
+    for slot in range(INTERIOR_POOL_SIZE):
+        key = layout_key(building_type, width, height, slot)
+        if key not in llm_results:
+            llm_results[key] = json.dumps(layout)
+            return True
+    return False
+
+def _door_approach(width, height):
+    return width // 2, height - 2 # Inside the door in the middle of the bottom wall
+
+def parse_layout(llm_response, width, height):
+    """Turns an LLM response into a layout, dropping unknown, overlapping or misplaced items.
+
+    Items must sit inside the walls and keep the tile inside the door clear. Returns
+    None if nothing usable is left.
+    """
+    try:
+        decorations = json.loads(llm_response).get("decorations", [])
+    except (json.JSONDecodeError, AttributeError) as e:
+        print(f"Error parsing LLM response for interior decoration: {e}")
+        return None
+    layout = []
+    used = {_door_approach(width, height)}
+    for item in decorations:
+        if not isinstance(item, dict):
+            continue
+        item_type, x, y = item.get("type"), item.get("x"), item.get("y")
+        if item_type not in DECORATION_ITEM_DEFINITIONS or not isinstance(x, int) or not isinstance(y, int):
+            continue
+        if not (1 <= x < width - 1 and 1 <= y < height - 1) or (x, y) in used:
+            continue
+        used.add((x, y))
+        layout.append([item_type, x, y])
+    return layout or None
+
+def vary_layout(layout, width, height, rng):
+    """Derives a new furnishing from a pooled layout by mirroring it and swapping similar items."""
+    mirror_x, mirror_y = rng.random() < 0.5, rng.random() < 0.5
+    door = _door_approach(width, height)
+    varied = []
+    for item_type, x, y in layout:
+        if mirror_x:
+            x = width - 1 - x
+        if mirror_y:
+            y = height - 1 - y
+        if (x, y) == door:
+            continue
+        if item_type in _SWAPS:
+            item_type = rng.choice(_SWAPS[item_type])
+        varied.append([item_type, x, y])
+    return varied
@@ -0,0 +1,51 @@
+# worldgen/prefabs.py
+import numpy as np
+from data.buildings import BUILDING_TYPES
+from tile_types import TILE_ID_DTYPE, tile_id
+
+_prefab_cache = {} # (building_type, width, height) -> read-only tile-ID array
+
+def get_prefab(building_type, width, height):
+    """Returns the (height, width) tile-ID array for a building, built once per type and size."""
+    key = (building_type, width, height)
+    prefab = _prefab_cache.get(key)
+    if prefab is not None:
+        return prefab
+
+    definition = BUILDING_TYPES[building_type]
+    prefab = np.full((height, width), tile_id(definition["floor"]), dtype=TILE_ID_DTYPE)
+    wall = tile_id(definition["wall"])
+    prefab[0, :] = prefab[-1, :] = wall
+    prefab[:, 0] = prefab[:, -1] = wall
+    if definition["windows"] and height > 3:
+        prefab[[1, 1, height - 2, height - 2], [0, width - 1, 0, width - 1]] = tile_id("window")
+    if definition["door"]:
+        prefab[height - 1, width // 2] = tile_id("door") # Bottom wall
+
+    prefab.flags.writeable = False
+    _prefab_cache[key] = prefab
+    return prefab
+
+def stamp_prefab(tiles, building):
+    """Copies a building's prefab into a chunk's tile array with one slice assignment."""
+    prefab = get_prefab(building.building_type, building.width, building.height)
+    tiles[building.y:building.y + building.height, building.x:building.x + building.width] = prefab
+
+def find_free_positions(occupied, width, height, margin=0):
+    """Returns every (x, y) where a width x height footprint avoids the occupied mask.
+
+    All candidate positions are tested at once with a summed-area table. margin keeps
+    the footprint that many tiles away from the array edges.
+    """
+    rows, cols = occupied.shape
+    summed = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+    summed[1:, 1:] = occupied.cumsum(axis=0).cumsum(axis=1)
+    # Occupied count in every height x width window, indexed by its top-left corner
+    counts = summed[height:, width:] - summed[:-height, width:] - summed[height:, :-width] + summed[:-height, :-width]
+    free = counts == 0
+    free[:margin, :] = False
+    free[:, :margin] = False
+    free[rows - height - margin + 1:, :] = False
+    free[:, cols - width - margin + 1:] = False
+    ys, xs = np.nonzero(free)
+    return list(zip(xs.tolist(), ys.tolist()))
@@ -0,0 +1,90 @@
+# worldgen/terrain.py
+import numpy as np
+import tcod.noise
+from config import (
+    CHUNK_SIZE, NOISE_SCALE, NOISE_OCTAVES, NOISE_PERSISTENCE, NOISE_LACUNARITY,
+    MOISTURE_SCALE, TEMPERATURE_SCALE, TERRAIN_JITTER, TERRAIN_JITTER_SCALE,
+    ELEVATION_DEEP_WATER, ELEVATION_WATER, ELEVATION_MOUNTAIN, ELEVATION_SNOW,
+    FOREST_MOISTURE, SNOW_TEMPERATURE,
+)
+from data.biomes import BIOME_DETAIL_RULES
+
+# Biome IDs index this list; per-tile biome maps store them as uint8.
+BIOME_NAMES = list(BIOME_DETAIL_RULES.keys())
+BIOME_IDS = {name: biome_id for biome_id, name in enumerate(BIOME_NAMES)}
+
+def chunk_tile_coords(chunk_coords):
+    """World x and y of every tile of the chunks, each shaped (chunks, CHUNK_SIZE, CHUNK_SIZE)."""
+    coords = np.asarray(chunk_coords).reshape(-1, 2)
+    local = np.arange(CHUNK_SIZE)
+    xs = coords[:, 0, None, None] * CHUNK_SIZE + local[None, None, :]
+    ys = coords[:, 1, None, None] * CHUNK_SIZE + local[None, :, None]
+    return np.broadcast_arrays(xs, ys)
+
+class TerrainGenerator:
+    """Continuous elevation, moisture and temperature fields, classified into biomes per tile.
+
+    Every field is sampled for a whole batch of chunks with one vectorized noise call,
+    and because the fields are continuous, biomes line up across chunk borders.
+    """
+    def __init__(self, seed):
+        self.elevation = self._fbm(seed)
+        self.moisture = self._fbm(seed + 1)
+        self.temperature = self._fbm(seed + 2)
+        # Fine noise nudging the fields, so biome borders are ragged instead of smooth contour lines
+        self.jitter = tcod.noise.Noise(dimensions=2, algorithm=tcod.noise.Algorithm.SIMPLEX, seed=seed + 3)
+
+    def _fbm(self, seed):
+        return tcod.noise.Noise(
+            dimensions=2,
+            algorithm=tcod.noise.Algorithm.SIMPLEX,
+            implementation=tcod.noise.Implementation.FBM,
+            hurst=NOISE_PERSISTENCE,
+            lacunarity=NOISE_LACUNARITY,
+            octaves=NOISE_OCTAVES,
+            seed=seed
+        )
+
+    def _sample(self, noise, xs, ys, scale):
+        """Samples noise at tile coordinates and maps it from [-1, 1] to [0, 1]."""
+        values = noise.sample_mgrid(np.stack([xs * scale, ys * scale]).astype(np.float32))
+        return np.clip((values + 1.0) * 0.5, 0.0, 1.0)
+
+    def sample(self, xs, ys, jitter=True):
+        """Returns (elevation, moisture, temperature) in [0, 1] at arrays of tile coordinates."""
+        elevation = self._sample(self.elevation, xs, ys, NOISE_SCALE)
+        moisture = self._sample(self.moisture, xs, ys, MOISTURE_SCALE)
+        temperature = self._sample(self.temperature, xs, ys, TEMPERATURE_SCALE)
+        if jitter:
+            nudge = TERRAIN_JITTER * (self._sample(self.jitter, xs, ys, TERRAIN_JITTER_SCALE) * 2.0 - 1.0)
+            elevation += nudge
+            moisture -= nudge
+        # Higher ground is colder
+        temperature = temperature - np.clip(elevation - ELEVATION_WATER, 0.0, None) * 0.3
+        return elevation, moisture, temperature
+
+    def classify(self, elevation, moisture, temperature):
+        """Returns uint8 biome IDs for arrays of terrain values."""
+        conditions = [
+            elevation < ELEVATION_DEEP_WATER,
+            elevation < ELEVATION_WATER,
+            (elevation >= ELEVATION_SNOW) | ((elevation >= ELEVATION_MOUNTAIN) & (temperature < SNOW_TEMPERATURE)),
+            elevation >= ELEVATION_MOUNTAIN,
+            moisture >= FOREST_MOISTURE,
+        ]
+        choices = [BIOME_IDS[name] for name in ("deep_water", "water", "snow", "mountain", "forest")]
+        return np.select(conditions, choices, BIOME_IDS["plains"]).astype(np.uint8)
+
+    def chunk_biomes(self, chunk_coords):
+        """Per-tile biome IDs for a batch of chunks, shaped (chunks, CHUNK_SIZE, CHUNK_SIZE)."""
+        xs, ys = chunk_tile_coords(chunk_coords)
+        return self.classify(*self.sample(xs, ys))
+
+    def macro_biomes(self, chunk_width, chunk_height):
+        """Biome names at the center tile of every chunk, shaped (chunk_height, chunk_width).
+
+        Used for chunk-level decisions (POIs, villages) without generating any tiles.
+        """
+        ys, xs = np.mgrid[:chunk_height, :chunk_width] * CHUNK_SIZE + CHUNK_SIZE // 2
+        biome_ids = self.classify(*self.sample(xs, ys, jitter=False))
+        return np.array(BIOME_NAMES)[biome_ids]